@@ -13,7 +13,7 @@ setup(
         'python-jose[cryptography]',
         'python-multipart',
         'psutil',
-        'kubernetes'
+        'kubernetes_asyncio'
     ],
     python_requires='>=3.9',
 )
@@ -11,6 +11,18 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
+_ACCESS_TOKEN_EXPIRE = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)))
+
+# Verified against when the email is unknown so login timing does not reveal
+# whether an account exists.
+_DUMMY_HASH = get_password_hash("x" * 16)
+
+
+def reload_config():
+    """Re-reads token settings from the environment (e.g. after tests patch it)."""
+    global _ACCESS_TOKEN_EXPIRE
+    _ACCESS_TOKEN_EXPIRE = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)))
+
 
 def commit_or_rollback(db: Session, operation_name: str):
     """Utility function to handle database commits and rollbacks."""
@@ -59,7 +71,9 @@ def create_user(db: Session, user_data: dict):
 def authenticate_user(db: Session, user_data: dict):
     """Authenticates a user based on email and password."""
     db_user = db.query(models.User).filter(models.User.email == user_data["email"]).first()
-    if not db_user or not verify_password(user_data["password"], db_user.password):
+    stored_hash = db_user.password if db_user else _DUMMY_HASH
+    password_ok = verify_password(user_data["password"], stored_hash)
+    if not db_user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password"
         )
@@ -68,8 +82,7 @@ def authenticate_user(db: Session, user_data: dict):
 
 def create_token(user):
     """Creates an access token for a user."""
-    expires_delta = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)))
-    access_token = create_access_token(data={"sub": user.email}, expires_delta=expires_delta)
+    access_token = create_access_token(data={"sub": user.email}, expires_delta=_ACCESS_TOKEN_EXPIRE)
     return access_token
 
 
@@ -101,30 +114,26 @@ def confirm_reset_password(db: Session, user_data: dict, token: str):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token"
         )
-    hashed_password = get_password_hash(user_data["password"])
-    user.password = hashed_password
-    user.reset_token = None
-    user.reset_token_expires = None
-    commit_or_rollback(db, "password reset confirmation")
-        
-    # Limit the number of tries
+
+    # Limit the number of tries before touching the password
     now = datetime.utcnow()
     one_hour_ago = now - timedelta(hours=1)
     if user.reset_password_last_try is None or user.reset_password_last_try < one_hour_ago:
         user.reset_password_tries = 1
-        user.reset_password_last_try = now
     else:
         user.reset_password_tries += 1
-    
-        if user.reset_password_tries > 3:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many password reset attempts. Please try again later.",
-            )
-        user.reset_password_last_try = now
+    user.reset_password_last_try = now
 
-    db.commit()
+    if user.reset_password_tries > 3:
+        commit_or_rollback(db, "password reset confirmation")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many password reset attempts. Please try again later.",
+        )
 
+    user.password = get_password_hash(user_data["password"])
+    user.reset_token = None
+    user.reset_token_expires = None
     commit_or_rollback(db, "password reset confirmation")
     return user
 
@@ -145,10 +154,14 @@ def get_current_user(token: str, db: Session = Depends(get_db)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-        db_revoked_token = db.query(models.RevokedToken).filter(models.RevokedToken.token == token).first()
-    )
+    db_revoked_token = db.query(models.RevokedToken).filter(models.RevokedToken.token == token).first()
+    if db_revoked_token is not None:
+        raise credentials_exception
     try:
+        # verify_token returns None for a token that fails to decode
         payload = verify_token(token)
+        if payload is None:
+            raise credentials_exception
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
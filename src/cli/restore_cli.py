@@ -36,8 +36,7 @@ async def list_backups(limit: int, format: str):
     """List available database backups"""
     try:
         manager = RestoreManager()
-        backups = await manager.list_available_backups()
-        backups = backups[:limit]
+        backups = await manager.list_available_backups(limit=limit)
 
         if format == 'json':
             console.print_json(data=backups)
@@ -2,25 +2,84 @@
 import logging
 from pathlib import Path
 import yaml
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple
+import orjson
 from datetime import datetime
 import asyncio
+import os
+import signal
+import time
+from functools import lru_cache
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _YamlLoader
 
 logger = logging.getLogger(__name__)
 
+# Seconds a loaded configuration is served before the files are checked again
+CONFIG_CACHE_TTL = 60
+
+_MISSING = object()
+
+# YAML may produce non-string keys; timestamps are naive UTC datetimes
+_HISTORY_JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a YAML file; keyed on mtime so edits invalidate the entry"""
+    # Hand libyaml the raw bytes; it detects the encoding itself
+    with open(path_str, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
 class ConfigurationManager:
     """Advanced configuration management system"""
 
+    __slots__ = (
+        'config_path', 'config_history', 'active_config', 'validators',
+        '_ordered_validators', '_cache_ts', '_cache_ttl', '_initialized',
+    )
+
     def __init__(self):
         self.config_path = Path('config')
-        self.config_path.mkdir(exist_ok=True)
-        self.config_history = self.config_path / 'config_history.json'
+        self.config_history = self.config_path / 'config_history.jsonl'
         self.active_config = {}
         self.validators = {}
+        self._ordered_validators: Tuple[Tuple[str, Callable], ...] = ()
+        self._cache_ts: Optional[float] = None
+        self._cache_ttl = CONFIG_CACHE_TTL
+        self._initialized = False
+
+    async def initialize(self):
+        """Create the config directory and install the reload signal; call once at startup"""
+        if self._initialized:
+            return
+        await asyncio.to_thread(self.config_path.mkdir, exist_ok=True)
+        self._register_reload_signal()
+        self._initialized = True
+
+    def _register_reload_signal(self):
+        """Invalidate the cached configuration on SIGHUP so it reloads without a restart"""
+        if not hasattr(signal, 'SIGHUP'):
+            return
+        try:
+            signal.signal(signal.SIGHUP, lambda *_: self.invalidate())
+        except ValueError:
+            # Signal handlers can only be installed from the main thread
+            logger.debug("SIGHUP reload not registered outside the main thread")
+
+    def invalidate(self):
+        """Force the next load_configuration call to re-read and re-validate"""
+        self._cache_ts = None
 
     async def load_configuration(self):
-        """Load and validate configuration"""
+        """Load and validate configuration, reusing the last result for up to _cache_ttl seconds"""
+        if self._cache_ts is not None and time.monotonic() - self._cache_ts < self._cache_ttl:
+            return self.active_config
+
+        await self.initialize()
         try:
             # Load base configuration
             base_config = self._load_yaml('base_config.yaml')
@@ -34,6 +93,7 @@ class ConfigurationManager:
             # Validate configuration
             if await self._validate_configuration(self.active_config):
                 await self._save_config_history()
+                self._cache_ts = time.monotonic()
                 return self.active_config
             else:
                 raise ValueError("Configuration validation failed")
@@ -42,9 +102,20 @@ class ConfigurationManager:
             logger.error(f"Configuration loading failed: {str(e)}")
             raise
 
+    def _load_yaml(self, filename: str) -> Dict[str, Any]:
+        """Load a YAML file from the config directory, reusing the parsed result until it changes"""
+        path = self.config_path / filename
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            logger.warning(f"Configuration file not found: {path}")
+            return {}
+        return _load_yaml_cached(str(path), mtime_ns)
+
     def register_validator(self, section: str, validator_func):
         """Register configuration validator"""
         self.validators[section] = validator_func
+        self._ordered_validators = tuple(self.validators.items())
 
     async def update_configuration(self, updates: Dict[str, Any]):
         """Update configuration with validation"""
@@ -72,39 +143,75 @@ class ConfigurationManager:
     async def _validate_configuration(self, config: Dict) -> bool:
         """Validate configuration using registered validators"""
         try:
-            for section, validator in self.validators.items():
-                if section in config:
-                    if not await validator(config[section]):
-                        logger.error(f"Validation failed for section: {section}")
-                        return False
+            checks = [(section, validator) for section, validator in self._ordered_validators if section in config]
+            results = await asyncio.gather(*(validator(config[section]) for section, validator in checks))
+            for (section, _), passed in zip(checks, results):
+                if not passed:
+                    logger.error(f"Validation failed for section: {section}")
+                    return False
             return True
         except Exception as e:
             logger.error(f"Configuration validation failed: {str(e)}")
             return False
 
     def _merge_configs(self, base: Dict, override: Dict) -> Dict:
-        """Deep merge configuration dictionaries"""
-        merged = base.copy()
-        for key, value in override.items():
-            if key in merged and isinstance(merged[key], dict) and isinstance(value, dict):
-                merged[key] = self._merge_configs(merged[key], value)
-            else:
-                merged[key] = value
-        return merged
+        """
+        Deep merge configuration dictionaries (copy-on-write).
+
+        Untouched branches of base are shared with the result; only dicts on the path to a
+        changed value are copied. base itself is never mutated, and is returned as-is when
+        override changes nothing.
+        """
+        # Frame: [source dict, copy (None until first write), parent frame, key in parent]
+        root = [base, None, None, None]
+        stack = [(root, override)]
+        while stack:
+            frame, source = stack.pop()
+            target = frame[0]
+            for key, value in source.items():
+                current = target.get(key, _MISSING)
+                if isinstance(value, dict) and isinstance(current, dict):
+                    stack.append(([current, None, frame, key], value))
+                elif current is not value and (current is _MISSING or current != value):
+                    self._materialize(frame)[key] = value
+        return base if root[1] is None else root[1]
+
+    @staticmethod
+    def _materialize(frame: list) -> Dict:
+        """Copy a merge frame's dict and link copies up to the nearest already-copied ancestor"""
+        if frame[1] is not None:
+            return frame[1]
+        frame[1] = dict(frame[0])
+        child = frame
+        parent = child[2]
+        while parent is not None:
+            if parent[1] is not None:
+                parent[1][child[3]] = child[1]
+                break
+            parent[1] = dict(parent[0])
+            parent[1][child[3]] = child[1]
+            child, parent = parent, parent[2]
+        return frame[1]
 
     async def _save_config_history(self):
-        """Save configuration change history"""
-        history = []
-        if self.config_history.exists():
-            history = json.loads(self.config_history.read_text())
-
-        history.append({
-            'timestamp': datetime.utcnow().isoformat(),
+        """Append the active configuration to the change history (one JSON object per line)"""
+        entry = {
+            'timestamp': datetime.utcnow(),
             'config': self.active_config,
             'user': self._get_current_user()
-        })
-
-        self.config_history.write_text(json.dumps(history, indent=2))
+        }
+
+        with self.config_history.open('ab') as f:
+            f.write(orjson.dumps(entry, option=_HISTORY_JSON_OPTIONS) + b'\n')
+
+    def iter_config_history(self) -> Iterator[Dict[str, Any]]:
+        """Yield configuration history entries lazily, oldest first"""
+        if not self.config_history.exists():
+            return
+        with self.config_history.open('rb') as f:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
 
 if __name__ == "__main__":
     config_manager = ConfigurationManager()
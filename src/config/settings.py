@@ -1,10 +1,41 @@
 """
 This module defines the settings for the application.
 """
+import os
 from pydantic import BaseSettings, Field
-from functools import lru_cache
+from functools import lru_cache, cached_property
 from fastapi.security import OAuth2PasswordBearer
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from dotenv import dotenv_values
+
+
+@lru_cache()
+def _env_file_values() -> Dict[str, Optional[str]]:
+    """Values from the .env file, read once on first secret lookup."""
+    return dotenv_values(".env")
+
+
+def _resolve_secret(name: str) -> str:
+    """
+    Resolve a secret from the environment, the .env file, or GCP Secret Manager, in that order.
+    Secret Manager is only consulted when GCP_PROJECT_ID is set.
+    """
+    value = os.getenv(name) or _env_file_values().get(name)
+    if value:
+        return value
+
+    project_id = os.getenv("GCP_PROJECT_ID")
+    if project_id:
+        from google.cloud import secretmanager
+
+        client = secretmanager.SecretManagerServiceClient()
+        response = client.access_secret_version(
+            name=f"projects/{project_id}/secrets/{name}/versions/latest"
+        )
+        return response.payload.data.decode("UTF-8")
+
+    raise ValueError(f"Secret {name} is not configured")
+
 
 class Settings(BaseSettings):
     """Settings for the application."""
@@ -14,27 +45,40 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     ALLOWED_HOSTS: List[str] = Field(["localhost"], env="ALLOWED_HOSTS")
     DEBUG: bool = Field(False, env="DEBUG")
-    OAUTH2_SCHEME: OAuth2PasswordBearer = Field(OAuth2PasswordBearer(tokenUrl="/api/auth/login"), env="OAUTH2_SCHEME") # scheme for the oauth2
-    SECRET_KEY: str = Field(..., env="SECRET_KEY")
-    JWT_SECRET_KEY: str = Field(..., env="JWT_SECRET_KEY")
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     ALGORITHM: str = Field("HS256", env="ALGORITHM")
     SMTP_SERVER: str = Field(..., env="SMTP_SERVER")
     SMTP_PORT: int = Field(..., env="SMTP_PORT")
     SMTP_USERNAME: str = Field(..., env="SMTP_USERNAME")
-    SMTP_PASSWORD: str = Field(..., env="SMTP_PASSWORD")
     FRONTEND_URL: str = Field(..., env="FRONTEND_URL") # url for the frontend
-    
-    class Config:
-        env_prefix = "PROD_"
-        env_file = ".env"
-    """
-    Configuration for the application.
-    Load the variable in the .env file.
-    """
+
     class Config:
+        """
+        Configuration for the application.
+        Load the variable in the .env file.
+        """
         env_file = ".env"
         env_file_encoding = "utf-8"
+        keep_untouched = (cached_property,)
+
+    # Secrets are resolved on first access so unused ones never hit Secret Manager
+    @cached_property
+    def SECRET_KEY(self) -> str:
+        return _resolve_secret("SECRET_KEY")
+
+    @cached_property
+    def JWT_SECRET_KEY(self) -> str:
+        return _resolve_secret("JWT_SECRET_KEY")
+
+    @cached_property
+    def SMTP_PASSWORD(self) -> str:
+        return _resolve_secret("SMTP_PASSWORD")
+
+    @cached_property
+    def allowed_origins(self) -> Tuple[str, ...]:
+        """ALLOWED_HOSTS as strings, computed once for the CORS middleware."""
+        return tuple(str(origin) for origin in self.ALLOWED_HOSTS)
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -42,6 +86,9 @@ def get_settings() -> Settings:
 
 settings = get_settings()
 
+# OAuth2 dependency; not configuration, so it lives outside Settings
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
 # Example of how to use the settings:
 # from src.config.settings import settings
 #
@@ -51,7 +98,7 @@ settings = get_settings()
 # print(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 # print(settings.ALLOWED_HOSTS)
 # print(settings.DEBUG)
-# print(settings.OAUTH2_SCHEME)
+# print(oauth2_scheme)
 #
 
 # from google.cloud import secretmanager
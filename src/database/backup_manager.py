@@ -5,28 +5,139 @@ This module provides functionalities to manage database backups, including creat
 verifying, and cleaning up old backups. It interacts with PostgreSQL for database operations
 and Google Cloud Storage for storing backups.
 """
-"""
-This module manages database backups, including creating, verifying, and cleaning up old backups.
-
-It uses PostgreSQL's pg_dump for creating backups and interacts with Google Cloud Storage for storing and retrieving backups.
-The module also manages backup verification using pg_restore and implements a retention policy for old backups.
-"""
 
 import logging
 import asyncio
+import contextlib
 import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
-from typing import Optional
+import re
+from typing import Optional, Set, Tuple, BinaryIO
 from google.cloud import storage
+from google.api_core.exceptions import NotFound
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
 import gzip
 import hashlib
+import tempfile
+import threading
 import time
 from ..monitoring.backup_metrics import BackupMetricsManager
 
 logger = logging.getLogger(__name__)
 
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+# "sha256" (default) or "xxh3" for faster integrity-only checksums; recorded per blob
+CHECKSUM_ALGORITHM = os.getenv("BACKUP_CHECKSUM_ALGO", "sha256")
+# "zstd" pipes an uncompressed custom-format dump through multithreaded zstd; anything else
+# keeps pg_dump's built-in zlib compression. Recorded per blob.
+BACKUP_COMPRESSION = os.getenv("BACKUP_COMPRESSION", "zlib")
+ZSTD_LEVEL = 3
+# Resumable upload chunk size; GCS requires a multiple of 256 KiB
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CLEANUP_CONCURRENCY = 16
+LIST_PAGE_SIZE = 1000
+# Matches the largest fan-out (cleanup deletions) with headroom for uploads
+GCS_POOL_SIZE = 32
+
+_BACKUP_DATE_RE = re.compile(r"backup_(\d{4})(\d{2})(\d{2})_")
+
+_storage_client: Optional[storage.Client] = None
+_verified_buckets: Set[str] = set()
+_storage_lock = threading.Lock()
+
+
+def _get_storage_client() -> storage.Client:
+    """Return the process-wide GCS client, creating it on first use."""
+    global _storage_client
+    if _storage_client is None:
+        with _storage_lock:
+            if _storage_client is None:
+                _storage_client = _create_storage_client()
+    return _storage_client
+
+
+def _create_storage_client() -> storage.Client:
+    """Build a GCS client whose HTTP session keeps a pool of keep-alive connections."""
+    credentials, project = google.auth.default()
+    session = AuthorizedSession(credentials, refresh_status_codes=(401,))
+    adapter = HTTPAdapter(pool_connections=GCS_POOL_SIZE, pool_maxsize=GCS_POOL_SIZE)
+    session.mount("https://", adapter)
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
+
+def _get_bucket(client: storage.Client, bucket_name: str) -> storage.Bucket:
+    """Return a bucket handle, creating the bucket if the first existence check finds it missing."""
+    bucket = client.bucket(bucket_name)
+    if bucket_name not in _verified_buckets:
+        with _storage_lock:
+            if bucket_name not in _verified_buckets:
+                if not bucket.exists():
+                    bucket.create()
+                _verified_buckets.add(bucket_name)
+    return bucket
+
+
+def new_hasher(algorithm: str = "sha256"):
+    """
+    Return a hash object for a backup checksum algorithm.
+
+    "xxh3" selects the non-cryptographic xxh3_128 (integrity only, much faster on multi-GB
+    dumps); anything else is passed to hashlib.
+    """
+    if algorithm == "xxh3":
+        import xxhash
+        return xxhash.xxh3_128()
+    return hashlib.new(algorithm)
+
+
+def checksum_stream(f: BinaryIO, algorithm: str = "sha256") -> str:
+    """Hash a binary stream, using hashlib.file_digest where available."""
+    if algorithm != "xxh3" and hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(f, algorithm).hexdigest()
+
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(CHECKSUM_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        read = f.readinto(buffer)
+        if not read:
+            break
+        hasher.update(view[:read])
+    return hasher.hexdigest()
+
+
+def zstd_decompress_file(src: Path, dst: Path):
+    """Decompress a zstd-compressed dump to dst so pg_restore can seek in it."""
+    import zstandard
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        zstandard.ZstdDecompressor().copy_stream(fin, fout, write_size=UPLOAD_CHUNK_SIZE)
+
+
+class _HashingReader:
+    """File-like wrapper that updates a checksum with every chunk read."""
+
+    def __init__(self, stream: BinaryIO, algorithm: str = "sha256"):
+        self._stream = stream
+        self._hasher = new_hasher(algorithm)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self._hasher.update(chunk)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def tell(self) -> int:
+        return self.bytes_read
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
 class DatabaseBackupManager:
     """
     Manages the creation, verification, and cleanup of database backups.
@@ -39,76 +150,83 @@ class DatabaseBackupManager:
         metrics (BackupMetricsManager): Manager for recording backup metrics.
         bucket (storage.Bucket): The GCS bucket object.
     """
+    __slots__ = (
+        "backup_dir", "storage_client", "bucket_name", "retention_days", "metrics", "bucket",
+        "_initialized",
+    )
+
     def __init__(self):
         """
         Initializes the DatabaseBackupManager.
 
-        Sets up the local backup directory, GCS client, bucket, retention period, and metrics manager.
+        Only records configuration; the backup directory, GCS client and bucket are set up by
+        initialize() so that constructing the manager performs no I/O.
         """
         self.backup_dir = Path("/app/backups")
-        self.backup_dir.mkdir(exist_ok=True)
-        self.storage_client = storage.Client()
-        """Initialize the DatabaseBackupManager with configurations and setup."""
         self.bucket_name = os.getenv("BACKUP_BUCKET", "secureai-backups")
         self.retention_days = int(os.getenv("BACKUP_RETENTION_DAYS", "7"))
         self.metrics = BackupMetricsManager()
+        self.storage_client: Optional[storage.Client] = None
+        self.bucket: Optional[storage.Bucket] = None
+        self._initialized = False
+
+    async def initialize(self):
+        """
+        Creates the local backup directory and connects to the backup bucket.
+
+        Meant to be awaited once from the application startup hook; the public operations call it
+        too, so it is safe to skip. Subsequent calls return immediately.
+        """
+        if self._initialized:
+            return
+        await asyncio.to_thread(self.backup_dir.mkdir, exist_ok=True)
+        self.storage_client = await asyncio.to_thread(_get_storage_client)
 
-        # Ensure bucket exists
-        self.bucket = self.storage_client.bucket(self.bucket_name)
-        if not self.bucket.exists():
-            self.bucket.create()
+        # Ensure bucket exists (checked once per process)
+        self.bucket = await asyncio.to_thread(_get_bucket, self.storage_client, self.bucket_name)
+        self._initialized = True
 
     async def create_backup(self) -> Optional[str]:
         """
         Creates a compressed database backup using pg_dump and uploads it to Google Cloud Storage.
 
-        The backup is stored in a custom format with maximum compression.
-        It calculates a checksum for the backup file and includes it as metadata in the cloud storage object.
+        The backup is stored in a custom format with maximum compression. pg_dump writes to
+        stdout, and the stream is hashed and uploaded to GCS in a single pass, so the dump is
+        never materialized on local disk. The checksum is attached as blob metadata once the
+        upload completes.
         
         Returns:
-            Optional[str]: The local file path of the created backup if successful, otherwise None.
+            Optional[str]: The file name of the created backup, as accepted by verify_backup, if
+                successful, otherwise None.
         
         Raises:
             Exception: If the pg_dump process fails or any other error occurs during the backup process.        """
         start_time = time.time()
         try:
+            await self.initialize()
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            backup_file = self.backup_dir / f"backup_{timestamp}.sql.gz"
+            compress_with_zstd = BACKUP_COMPRESSION == "zstd"
+            suffix = "dump.zst" if compress_with_zstd else "sql.gz"
+            backup_name = f"backup_{timestamp}.{suffix}"
+            blob_name = f"backups/{backup_name}"
 
-            # Create backup using pg_dump
+            # Create backup using pg_dump, streamed to stdout
             cmd = [
                 "pg_dump",
                 "-h", os.getenv("DB_HOST"),
                 "-U", os.getenv("DB_USER"),
                 "-d", os.getenv("DB_NAME"),
                 "-F", "c",  # Custom format
-                "-Z", "9",  # Maximum compression
-                "-f", str(backup_file)
+                # Leave compression to zstd, otherwise use maximum zlib compression
+                "-Z", "0" if compress_with_zstd else "9",
             ]
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                env={"PGPASSWORD": os.getenv("DB_PASSWORD")},
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            checksum, size = await asyncio.to_thread(
+                self._stream_dump_to_gcs, cmd, blob_name, compress_with_zstd
             )
 
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                raise Exception(f"Backup failed: {stderr.decode()}")
-
-            # Calculate checksum
-            checksum = self._calculate_checksum(backup_file)
-
-            # Upload to GCS
-            blob = self.bucket.blob(f"backups/{backup_file.name}")
-            blob.metadata = {"checksum": checksum}
-            blob.upload_from_filename(str(backup_file))
-
             # Record metrics
             duration = time.time() - start_time
-            size = os.path.getsize(backup_file)
             self.metrics.record_backup_completion(
                 duration=duration,
                 size=size,
@@ -116,8 +234,8 @@ class DatabaseBackupManager:
             )
             self.metrics.update_backup_age(datetime.utcnow())
 
-            logger.info(f"Backup created successfully: {backup_file.name}")
-            return str(backup_file)
+            logger.info(f"Backup created successfully: {blob_name} ({CHECKSUM_ALGORITHM} {checksum})")
+            return backup_name
 
         except Exception as e:
             self.metrics.record_backup_completion(
@@ -127,42 +245,127 @@ class DatabaseBackupManager:
             )
             logger.error(f"Backup failed: {str(e)}")
             return None
-        finally:
-            # Cleanup local file
-            if backup_file.exists():
-                backup_file.unlink()
 
-    async def verify_backup(self, backup_file: str) -> bool:
+    def _stream_dump_to_gcs(
+        self, cmd: list, blob_name: str, compress_with_zstd: bool = False
+    ) -> Tuple[str, int]:
+        """
+        Runs pg_dump and uploads its stdout to GCS while hashing it.
+
+        With compress_with_zstd the dump is piped through `zstd -T0` first, and the checksum
+        covers the compressed bytes as stored.
+
+        Args:
+            cmd (list): The pg_dump command line, writing to stdout.
+            blob_name (str): The destination object name in the backup bucket.
+            compress_with_zstd (bool): Whether to compress the dump with zstd.
+
+        Returns:
+            Tuple[str, int]: The checksum and size in bytes of the uploaded dump.
+
+        Raises:
+            Exception: If pg_dump or zstd exits with a non-zero status.
+        """
+        blob = self.bucket.blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                env={"PGPASSWORD": os.getenv("DB_PASSWORD")},
+                stdout=subprocess.PIPE,
+                stderr=stderr_file
+            )
+            processes = [process]
+            if compress_with_zstd:
+                compressor = subprocess.Popen(
+                    ["zstd", "-T0", f"-{ZSTD_LEVEL}", "-c"],
+                    stdin=process.stdout,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file
+                )
+                # zstd now owns the read end of pg_dump's pipe
+                process.stdout.close()
+                processes.append(compressor)
+            output = processes[-1].stdout
+            reader = _HashingReader(output, CHECKSUM_ALGORITHM)
+            try:
+                blob.upload_from_file(reader, rewind=False)
+            finally:
+                output.close()
+                returncodes = [p.wait() for p in processes]
+
+            if any(returncodes):
+                stderr_file.seek(0)
+                # The upload may never have finalized the object; don't let that hide the dump error
+                with contextlib.suppress(NotFound):
+                    blob.delete()
+                raise Exception(f"Backup failed: {stderr_file.read().decode()}")
+
+        checksum = reader.hexdigest()
+        blob.metadata = {
+            "checksum": checksum,
+            "checksum_algo": CHECKSUM_ALGORITHM,
+            "compression": "zstd" if compress_with_zstd else "zlib",
+        }
+        blob.patch()
+        return checksum, reader.bytes_read
+
+    async def verify_backup(self, backup_file: str, deep: bool = False) -> bool:
         """
-        Verifies the integrity of a backup file downloaded from Google Cloud Storage.
+        Verifies the integrity of a backup file stored in Google Cloud Storage.
 
-        It downloads the specified backup file from GCS, calculates its checksum, and compares it to the stored checksum.
-        It also attempts a test restore using pg_restore to ensure the backup can be restored.
+        The blob is streamed from GCS through SHA256 and compared to the stored checksum without
+        writing it to disk. With deep=True the backup is downloaded instead, and a test restore
+        using pg_restore --list additionally ensures it can be restored.
         
         Args:
             backup_file (str): The name of the backup file to verify.
+            deep (bool): Whether to also run the pg_restore structural check.
         
         Returns:
             bool: True if the backup is verified successfully, False otherwise.
         """
+        local_file = self.backup_dir / backup_file
         try:
+            await self.initialize()
+            blob = self.bucket.get_blob(f"backups/{backup_file}")
+            if blob is None:
+                raise Exception(f"Backup not found: {backup_file}")
+            metadata = blob.metadata or {}
+            stored_checksum = metadata.get("checksum")
+            algorithm = metadata.get("checksum_algo", "sha256")
+
+            if not deep:
+                # Checksum-only fast path: hash the download stream directly
+                calculated_checksum = await asyncio.to_thread(
+                    self._calculate_blob_checksum, blob, algorithm
+                )
+                if calculated_checksum != stored_checksum:
+                    raise Exception("Checksum verification failed")
+
+                self.metrics.record_verification(success=True)
+                logger.info(f"Backup checksum verified: {backup_file}")
+                return True
+
             # Download backup
-            blob = self.bucket.blob(f"backups/{backup_file}")
-            local_file = self.backup_dir / backup_file
-            blob.download_to_filename(str(local_file))
+            await asyncio.to_thread(blob.download_to_filename, str(local_file))
 
             # Verify checksum
-            calculated_checksum = self._calculate_checksum(local_file)
-            stored_checksum = blob.metadata.get("checksum")
+            calculated_checksum = self._calculate_checksum(local_file, algorithm)
 
             if calculated_checksum != stored_checksum:
                 raise Exception("Checksum verification failed")
 
+            # pg_restore reads the custom format, not the zstd frame around it
+            archive = local_file
+            if metadata.get("compression") == "zstd":
+                archive = local_file.with_suffix(".dump")
+                await asyncio.to_thread(zstd_decompress_file, local_file, archive)
+
             # Test restore
             test_cmd = [
                 "pg_restore",
                 "--list",
-                str(local_file)
+                str(archive)
             ]
 
             process = await asyncio.create_subprocess_exec(
@@ -186,51 +389,88 @@ class DatabaseBackupManager:
             return False
         finally:
             # Cleanup
-            if local_file.exists():
-                local_file.unlink()
+            for path in (local_file, local_file.with_suffix(".dump")):
+                if path.exists():
+                    path.unlink()
 
     async def cleanup_old_backups(self):
         """
         Cleans up old backup files in Google Cloud Storage that are older than the retention period.
 
         Iterates through all backup files in the GCS bucket, determines their creation dates based on file names,
-        and deletes those older than the specified retention period.
+        and deletes those older than the specified retention period. Deletions are issued concurrently,
+        bounded by CLEANUP_CONCURRENCY.
         """
         try:
-            blobs = self.bucket.list_blobs(prefix="backups/")
+            await self.initialize()
+
+            # Only blob names are needed, so ask GCS for nothing else
+            blobs = self.storage_client.list_blobs(
+                self.bucket,
+                prefix="backups/",
+                fields="items(name),nextPageToken",
+                page_size=LIST_PAGE_SIZE
+            )
             retention_date = datetime.utcnow() - timedelta(days=self.retention_days)
 
-            for blob in blobs:
-                # Extract date from filename
-                try:
-                    date_str = blob.name.split("_")[1].split(".")[0]
-                    backup_date = datetime.strptime(date_str, "%Y%m%d")
-
-                    if backup_date < retention_date:
-                        blob.delete()
+            to_delete = []
+            for page in blobs.pages:
+                for blob in page:
+                    # Extract date from filename
+                    try:
+                        match = _BACKUP_DATE_RE.search(blob.name)
+                        if not match:
+                            continue
+                        year, month, day = match.groups()
+                        backup_date = datetime(int(year), int(month), int(day))
+
+                        if backup_date < retention_date:
+                            to_delete.append(blob)
+                    except Exception as e:
+                        logger.warning(f"Failed to process backup {blob.name}: {str(e)}")
+
+            semaphore = asyncio.Semaphore(CLEANUP_CONCURRENCY)
+
+            async def delete(blob):
+                async with semaphore:
+                    try:
+                        await asyncio.to_thread(blob.delete)
                         logger.info(f"Deleted old backup: {blob.name}")
-                except Exception as e:
-                    logger.warning(f"Failed to process backup {blob.name}: {str(e)}")
+                    except Exception as e:
+                        logger.warning(f"Failed to delete backup {blob.name}: {str(e)}")
+
+            await asyncio.gather(*(delete(blob) for blob in to_delete))
 
         except Exception as e:
             logger.error(f"Backup cleanup failed: {str(e)}")
 
-    def _calculate_checksum(self, file_path: Path) -> str:
+    def _calculate_checksum(self, file_path: Path, algorithm: str = "sha256") -> str:
         """
-        Calculates the SHA256 checksum of a given file.
+        Calculates the checksum of a given file (SHA256 unless the backup recorded another algorithm).
 
-        Reads the file in chunks to handle large files and calculates the checksum.
+        Uses hashlib.file_digest (Python 3.11+), which hashes in C with the GIL
+        released; older interpreters fall back to 1 MiB reads into a reused buffer.
         
         Args:
             file_path (Path): The path to the file for which to calculate the checksum.
+            algorithm (str): The checksum algorithm recorded in the blob metadata.
 
         Returns:
-            str: The SHA256 checksum of the file as a hexadecimal string.
+            str: The checksum of the file as a hexadecimal string.
         """
-        sha256 = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+            return checksum_stream(f, algorithm)
 
+    def _calculate_blob_checksum(self, blob: storage.Blob, algorithm: str = "sha256") -> str:
+        """
+        Calculates the checksum of a GCS blob by streaming its contents.
 
+        Args:
+            blob (storage.Blob): The blob to hash.
+            algorithm (str): The checksum algorithm recorded in the blob metadata.
+
+        Returns:
+            str: The checksum of the blob as a hexadecimal string.
+        """
+        with blob.open("rb", chunk_size=UPLOAD_CHUNK_SIZE) as f:
+            return checksum_stream(f, algorithm)
@@ -1,33 +1,32 @@
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.exc import OperationalError
-from src.config import settings
+from src.config.settings import settings
+import asyncio
+import fcntl
 import logging
+import os
+import tempfile
 
 logger = logging.getLogger(__name__)
 
 DATABASE_URL = settings.DATABASE_URL  # Database URL
+# Sentinel file locked while one worker creates the schema, so sibling workers don't race on DDL
+SCHEMA_LOCK_FILE = os.path.join(tempfile.gettempdir(), "secureai-schema.lock")
 
-try:
-    engine = create_engine(DATABASE_URL)
-    
-    # Test the connection
-    with engine.connect() as connection:
-        result = connection.execute(text("SELECT 1"))
-        logger.info(f"Database connection successful: {result.scalar()}")
-
-except OperationalError as e:
-    logger.error(f"Database connection failed: {e}")
-    raise  # Re-raise the exception to halt execution
-
-except Exception as e:
-    logger.error(f"An unexpected error occurred: {e}")
-    raise  # Re-raise the exception to halt execution
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,  # Validate pooled connections on checkout instead of per request
+    pool_size=20,
+    max_overflow=10,
+)
 
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=Session
 )
 
+Base = declarative_base()
+
 def get_db() -> Session:
     """
     Creates a database session and yields it.
@@ -38,10 +37,54 @@ def get_db() -> Session:
     """
     db = SessionLocal()
     try:
-        db.execute(text("SELECT 1"))
         yield db
     except Exception as e:
         logger.error(f"Database error: {e}")
         raise
     finally:        
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def healthcheck() -> bool:
+    """
+    Verifies that the database is reachable.
+
+    Intended for startup hooks and health endpoints rather than import time, so importing this
+    module never blocks on the database.
+    """
+    def _ping():
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT 1")).scalar()
+
+    try:
+        result = await asyncio.to_thread(_ping)
+        logger.info(f"Database connection successful: {result}")
+        return True
+    except OperationalError as e:
+        logger.error(f"Database connection failed: {e}")
+        return False
+
+
+def _create_schema_locked(metadata) -> None:
+    with open(SCHEMA_LOCK_FILE, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            # create_all only issues DDL for missing tables, so workers that wait on the lock
+            # find the schema in place
+            metadata.create_all(bind=engine)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def init_schema(metadata) -> None:
+    """
+    Creates any missing tables for metadata.
+
+    Meant to run from a startup hook. It is skipped when SCHEMA_READY is set, and the DDL runs in a
+    worker thread under a file lock so only one worker process issues it at a time.
+    """
+    if os.getenv("SCHEMA_READY"):
+        return
+    await asyncio.to_thread(_create_schema_locked, metadata)
+    os.environ["SCHEMA_READY"] = "1"
+    logger.info("Database schema ready")
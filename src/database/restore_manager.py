@@ -10,17 +10,94 @@ import logging
 import asyncio
 from pathlib import Path
 import os
-from typing import List, Dict
+from typing import BinaryIO, Dict, List, Optional
 import tempfile
 import shutil
-import hashlib
+import heapq
+import itertools
 
+import psycopg
+from psycopg import errors, sql
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 
+from .backup_manager import checksum_stream, new_hasher, zstd_decompress_file
 from ..monitoring.backup_metrics import BackupMetricsManager
 
 logger = logging.getLogger(__name__)
 
+# Streaming download chunk size; bounds memory per in-flight request
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("RESTORE_DOWNLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+# Backups at least this large are downloaded as concurrent byte-range slices
+SLICED_DOWNLOAD_THRESHOLD = 1024 * 1024 * 1024
+DOWNLOAD_WORKERS = 8
+LIST_PAGE_SIZE = 1000
+# Backups below this size are latency-bound and restored in one transaction; larger ones are
+# bandwidth-bound and restored with parallel jobs
+SMALL_BACKUP_THRESHOLD = 256 * 1024 * 1024
+# Backups are downloaded to tmpfs when it has room for them with this much to spare
+TMPFS_DIR = Path("/dev/shm")
+TMPFS_HEADROOM = 2
+
+# Session-level settings for pg_restore's worker connections (passed via PGOPTIONS). They only
+# apply to the restore sessions, so nothing needs resetting afterwards; server-wide knobs such as
+# fsync are deliberately left alone.
+RESTORE_SESSION_OPTIONS = " ".join([
+    "-c maintenance_work_mem=1GB",
+    "-c max_parallel_maintenance_workers=4",
+    "-c synchronous_commit=off",
+])
+
+# Tiebreaker for heap entries of backups created at the same instant
+_heap_seq = itertools.count()
+
+def _advise(fd: int, advice: int):
+    """posix_fadvise over the whole file; a no-op where the platform lacks it."""
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, advice)
+
+
+def _drop_page_cache(path: Path):
+    """
+    Flushes a freshly written file and asks the kernel to evict it from the page cache.
+
+    Dump files are read once and deleted, so caching them only pushes Postgres's own
+    working set out of memory.
+    """
+    if not hasattr(os, "posix_fadvise") or not path.is_file():
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # DONTNEED only drops clean pages, so write the data back first
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+class _HashingWriter:
+    """File-like wrapper that hashes everything written through it."""
+
+    def __init__(self, stream: BinaryIO, algorithm: str = "sha256"):
+        self._stream = stream
+        self._hasher = new_hasher(algorithm)
+
+    def write(self, data: bytes) -> int:
+        self._hasher.update(data)
+        return self._stream.write(data)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+    def flush(self):
+        self._stream.flush()
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
 class RestoreManager:
     """
     Manages the restoration of database backups.
@@ -40,26 +117,54 @@ class RestoreManager:
         self.bucket = self.storage_client.bucket(self.bucket_name)
         self.metrics = BackupMetricsManager()
         self.restore_dir = Path("/app/restore")
-        self.restore_dir.mkdir(exist_ok=True) 
+        self.restore_dir.mkdir(exist_ok=True)
+
+        # libpq reads connection details from the environment, so child processes need no -h/-U
+        self._pg_env = {
+            **os.environ,
+            "PGHOST": os.getenv("DB_HOST", ""),
+            "PGUSER": os.getenv("DB_USER", ""),
+            "PGPASSWORD": os.getenv("DB_PASSWORD", ""),
+        }
+        self._restore_env = {**self._pg_env, "PGOPTIONS": RESTORE_SESSION_OPTIONS}
+        self._admin_pool: Optional[AsyncConnectionPool] = None
+        self._restore_mode = os.getenv("RESTORE_MODE", "download")
+
+    async def list_available_backups(self, limit: Optional[int] = None) -> List[Dict]:
+        """Lists available backups with metadata, newest first.
+
+        Pages are fetched in a worker thread so the listing never blocks the event loop. When
+        limit is given only the newest `limit` backups are kept while scanning.
+
+        Args:
+            limit (Optional[int]): Maximum number of backups to return.
 
-    async def list_available_backups(self) -> List[Dict]:
-        """Lists all available backups with metadata.
         Returns a list of dictionaries, each containing metadata of a backup.
         """
         try:
-            backups = []
-            blobs = self.bucket.list_blobs(prefix="backups/")
-
-            for blob in blobs:
-                backup_info = {
-                    'name': blob.name,
-                    'size': blob.size,
-                    'created': blob.time_created,
-                    'checksum': blob.metadata.get('checksum') if blob.metadata else None
-                }
-                backups.append(backup_info)
-
-            return sorted(backups, key=lambda x: x['created'], reverse=True)
+            heap = []
+            pages = self.bucket.list_blobs(prefix="backups/", page_size=LIST_PAGE_SIZE).pages
+
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+
+                for blob in page:
+                    backup_info = {
+                        'name': blob.name,
+                        'size': blob.size,
+                        'created': blob.time_created,
+                        'checksum': blob.metadata.get('checksum') if blob.metadata else None
+                    }
+                    # The sequence number breaks ties so dicts are never compared
+                    entry = (backup_info['created'], next(_heap_seq), backup_info)
+                    if limit is None or len(heap) < limit:
+                        heapq.heappush(heap, entry)
+                    else:
+                        heapq.heappushpop(heap, entry)
+
+            return [entry[2] for entry in sorted(heap, key=lambda x: x[0], reverse=True)]
 
         except Exception as e:
             logger.error(f"Failed to list backups: {str(e)}")
@@ -69,8 +174,12 @@ class RestoreManager:
         """
         Restores a specific backup to the target database.
 
-        Downloads the specified backup from Google Cloud Storage, verifies its integrity,
-        creates the target database if it does not exist, and then restores the backup.
+        In the default "download" mode the backup is downloaded, verified, and restored. The
+        restore is specialised on the backup size: backups under SMALL_BACKUP_THRESHOLD are
+        restored atomically with --single-transaction, larger ones with parallel pg_restore
+        jobs. In "stream" mode (RESTORE_MODE=stream) the blob is piped
+        straight into pg_restore's stdin, skipping the local copy; pg_restore cannot run
+        parallel jobs from stdin, and the checksum can only be confirmed once the stream ends.
 
         Args:
             backup_name (str): The name of the backup file to restore.
@@ -81,42 +190,28 @@ class RestoreManager:
         """
         temp_dir = None
         try:
-            temp_dir = tempfile.mkdtemp()
-            local_file = Path(temp_dir) / backup_name
-
-            # Download backup
-            blob = self.bucket.blob(f"backups/{backup_name}")
-            blob.download_to_filename(str(local_file))
-
-            # Verify backup before restore
-            if not await self._verify_backup(local_file, blob.metadata.get('checksum')):
-                raise Exception("Backup verification failed")
-
-            # Create target database if it doesn't exist
-            await self._create_database(target_db)
-
-            # Restore backup
-            cmd = [
-                "pg_restore",
-                "-h", os.getenv("DB_HOST"),
-                "-U", os.getenv("DB_USER"),
-                "-d", target_db,
-                "-c",  # Clean (drop) database objects before recreating
-                "-v",  # Verbose mode
-                str(local_file)
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                env={"PGPASSWORD": os.getenv("DB_PASSWORD")},
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                raise Exception(f"Restore failed: {stderr.decode()}")
+            blob = self.bucket.get_blob(f"backups/{backup_name}")
+            if blob is None:
+                raise Exception(f"Backup not found: {backup_name}")
+            metadata = blob.metadata or {}
+            expected_checksum = metadata.get('checksum')
+            algorithm = metadata.get('checksum_algo', 'sha256')
+            compressed = metadata.get('compression') == 'zstd'
+
+            if self._restore_mode == "stream":
+                # Create target database if it doesn't exist
+                await self._create_database(target_db)
+                await self._restore_from_stream(
+                    blob, target_db, expected_checksum, algorithm, compressed
+                )
+            else:
+                temp_dir = self._make_temp_dir(blob.size or 0)
+                local_file = Path(temp_dir) / backup_name
+                single_transaction = blob.size is not None and blob.size < SMALL_BACKUP_THRESHOLD
+                await self._restore_from_file(
+                    blob, local_file, target_db, expected_checksum, algorithm, compressed,
+                    single_transaction
+                )
 
             # Verify restoration
             if not await self._verify_restoration(target_db):
@@ -131,11 +226,211 @@ class RestoreManager:
 
         finally:
             # Cleanup
-            if temp_dir and os.path.exists(temp_dir):
-                import shutil
-                shutil.rmtree(temp_dir) 
+            if temp_dir:
+                await asyncio.to_thread(shutil.rmtree, temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _make_temp_dir(backup_size: int) -> str:
+        """
+        Creates the download directory, on tmpfs when it has room for the backup.
 
-    async def _verify_backup(self, backup_file: Path, expected_checksum: str) -> bool:
+        A tmpfs download never touches disk and is freed without per-file unlinks.
+        """
+        try:
+            if TMPFS_DIR.is_dir() and shutil.disk_usage(TMPFS_DIR).free > backup_size * TMPFS_HEADROOM:
+                return tempfile.mkdtemp(dir=TMPFS_DIR)
+        except OSError:
+            pass
+        return tempfile.mkdtemp()
+
+    async def _restore_from_file(
+        self,
+        blob: storage.Blob,
+        local_file: Path,
+        target_db: str,
+        expected_checksum: Optional[str],
+        algorithm: str = "sha256",
+        compressed: bool = False,
+        single_transaction: bool = False,
+    ):
+        """
+        Downloads a backup, verifies it, and restores it with pg_restore.
+
+        Restores run with parallel jobs, or in a single transaction when single_transaction is
+        set; pg_restore does not allow both.
+
+        zstd-compressed backups are checked against their checksum as downloaded and then
+        decompressed next to it, since parallel pg_restore needs a seekable archive.
+
+        Args:
+            blob (storage.Blob): The backup blob.
+            local_file (Path): Where to download the backup.
+            target_db (str): The database to restore into.
+            expected_checksum (Optional[str]): The checksum recorded when the backup was created.
+            algorithm (str): The checksum algorithm recorded alongside it.
+            compressed (bool): Whether the backup is zstd-compressed.
+            single_transaction (bool): Whether to restore atomically instead of in parallel.
+
+        Raises:
+            Exception: If verification or pg_restore fails.
+        """
+        streamed_checksum = await asyncio.to_thread(self._download_blob, blob, local_file, algorithm)
+        await asyncio.to_thread(_drop_page_cache, local_file)
+
+        # Checksum computed during download; only the structural check remains
+        if expected_checksum and streamed_checksum is not None:
+            if streamed_checksum != expected_checksum:
+                raise Exception("Checksum verification failed")
+            expected_checksum = None
+
+        if compressed:
+            # The checksum covers the compressed bytes, so check it before decompressing
+            if expected_checksum:
+                with open(local_file, "rb") as f:
+                    checksum = await asyncio.to_thread(checksum_stream, f, algorithm)
+                if checksum != expected_checksum:
+                    raise Exception("Checksum verification failed")
+                expected_checksum = None
+            archive = local_file.with_suffix(".dump")
+            await asyncio.to_thread(zstd_decompress_file, local_file, archive)
+            await asyncio.to_thread(local_file.unlink)
+            local_file = archive
+
+        # Verify the backup while the target database is created over the admin pool; the
+        # pg_restore --list child is the only process spawned before the restore itself
+        verified, _ = await asyncio.gather(
+            self._verify_backup(local_file, expected_checksum, algorithm),
+            self._create_database(target_db),
+        )
+        if not verified:
+            raise Exception("Backup verification failed")
+
+        cmd = [
+            "pg_restore",
+            "-d", target_db,
+            "-c",  # Clean (drop) database objects before recreating
+        ]
+        if single_transaction:
+            cmd.append("--single-transaction")
+        else:
+            # Spread data/index/constraint work across parallel jobs
+            cmd += ["-j", str(self._restore_jobs())]
+        if local_file.is_dir():
+            cmd += ["-F", "d"]  # Directory-format dump
+        cmd.append(str(local_file))
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            env=self._restore_env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        stdout, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            raise Exception(f"Restore failed: {stderr.decode()}")
+
+    async def _restore_from_stream(
+        self,
+        blob: storage.Blob,
+        target_db: str,
+        expected_checksum: Optional[str],
+        algorithm: str = "sha256",
+        compressed: bool = False,
+    ):
+        """
+        Pipes a backup from GCS into pg_restore's stdin, hashing it on the way.
+
+        zstd-compressed backups are decompressed in the same pass, so peak memory stays at one
+        chunk plus the decompression window.
+
+        Args:
+            blob (storage.Blob): The backup blob.
+            target_db (str): The database to restore into.
+            expected_checksum (Optional[str]): The checksum recorded when the backup was created.
+            algorithm (str): The checksum algorithm recorded alongside it.
+            compressed (bool): Whether the backup is zstd-compressed.
+
+        Raises:
+            Exception: If pg_restore fails or the streamed bytes do not match the checksum.
+        """
+        process = await asyncio.create_subprocess_exec(
+            "pg_restore", "-d", target_db, "-c",
+            env=self._restore_env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stderr_task = asyncio.create_task(process.stderr.read())
+
+        hasher = new_hasher(algorithm)
+        decompressor = None
+        if compressed:
+            import zstandard
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        try:
+            with blob.open("rb", chunk_size=DOWNLOAD_CHUNK_SIZE) as reader:
+                while True:
+                    chunk = await asyncio.to_thread(reader.read, DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    if decompressor is not None:
+                        chunk = await asyncio.to_thread(decompressor.decompress, chunk)
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+        finally:
+            process.stdin.close()
+            stderr = await stderr_task
+            await process.wait()
+
+        if process.returncode != 0:
+            raise Exception(f"Restore failed: {stderr.decode()}")
+        if expected_checksum and hasher.hexdigest() != expected_checksum:
+            raise Exception("Checksum verification failed after streaming restore")
+
+    def _download_blob(
+        self, blob: storage.Blob, local_file: Path, algorithm: str = "sha256"
+    ) -> Optional[str]:
+        """
+        Streams a blob to disk in bounded chunks, hashing it on the way.
+
+        Peak memory stays at one chunk regardless of backup size. Blobs above
+        SLICED_DOWNLOAD_THRESHOLD are fetched as concurrent byte-range slices to use more of
+        the available egress bandwidth; those arrive out of order, so they are not hashed here.
+
+        Args:
+            blob (storage.Blob): The backup blob, with its size loaded.
+            local_file (Path): Destination path.
+            algorithm (str): The checksum algorithm to compute while downloading.
+
+        Returns:
+            Optional[str]: The checksum of the downloaded bytes, or None for sliced downloads.
+        """
+        if blob.size and blob.size >= SLICED_DOWNLOAD_THRESHOLD:
+            transfer_manager.download_chunks_concurrently(
+                blob,
+                str(local_file),
+                chunk_size=DOWNLOAD_CHUNK_SIZE * 4,
+                max_workers=DOWNLOAD_WORKERS,
+            )
+            return None
+
+        blob.chunk_size = DOWNLOAD_CHUNK_SIZE
+        with open(local_file, "wb") as f:
+            writer = _HashingWriter(f, algorithm)
+            self.storage_client.download_blob_to_file(blob, writer)
+        return writer.hexdigest()
+
+    @staticmethod
+    def _restore_jobs() -> int:
+        """Number of parallel pg_restore workers: RESTORE_JOBS, or one per CPU."""
+        return int(os.getenv("RESTORE_JOBS", os.cpu_count() or 1))
+
+    async def _verify_backup(
+        self, backup_file: Path, expected_checksum: str, algorithm: str = "sha256"
+    ) -> bool:
         """
         Verifies the integrity of a backup file.
 
@@ -145,6 +440,7 @@ class RestoreManager:
         Args:
             backup_file (Path): The path to the backup file.
             expected_checksum (str): The expected checksum of the backup file.
+            algorithm (str): The checksum algorithm ("sha256" or "xxh3").
 
         Returns:
             bool: True if the backup is valid, False otherwise.
@@ -164,11 +460,12 @@ class RestoreManager:
 
             # Verify checksum if provided
             if expected_checksum:
-                sha256 = hashlib.sha256()
                 with open(backup_file, "rb") as f:
-                    for chunk in iter(lambda: f.read(4096), b""):
-                        sha256.update(chunk)
-                if sha256.hexdigest() != expected_checksum:
+                    # Read ahead aggressively, then drop the pages once hashed
+                    _advise(f.fileno(), getattr(os, "POSIX_FADV_SEQUENTIAL", 0))
+                    calculated_checksum = await asyncio.to_thread(checksum_stream, f, algorithm)
+                    _advise(f.fileno(), getattr(os, "POSIX_FADV_DONTNEED", 0))
+                if calculated_checksum != expected_checksum:
                     raise Exception("Checksum verification failed")
 
             return True
@@ -177,37 +474,57 @@ class RestoreManager:
             logger.error(f"Backup verification failed: {str(e)}")
             return False
 
+    def _conninfo(self, db_name: str) -> str:
+        """Builds a libpq connection string for db_name from the cached DB settings."""
+        return make_conninfo(
+            host=self._pg_env["PGHOST"],
+            user=self._pg_env["PGUSER"],
+            password=self._pg_env["PGPASSWORD"],
+            dbname=db_name,
+        )
+
+    async def _get_admin_pool(self) -> AsyncConnectionPool:
+        """
+        Returns the pool of autocommit connections to the postgres maintenance database,
+        opening it on first use.
+        """
+        if self._admin_pool is None:
+            pool = AsyncConnectionPool(
+                self._conninfo("postgres"),
+                min_size=1,
+                max_size=4,
+                kwargs={"autocommit": True},  # CREATE DATABASE cannot run in a transaction
+                open=False,
+            )
+            await pool.open()
+            self._admin_pool = pool
+        return self._admin_pool
+
     async def _create_database(self, db_name: str):
         """
         Creates a database if it does not exist.
 
-        Uses psql to attempt to create a database. Ignores the error if the database
-        already exists.
+        Checks pg_database over a pooled connection and only issues CREATE DATABASE when the
+        database is missing. The name is quoted as an identifier.
 
         Args:
             db_name (str): The name of the database to create.
         """
         try:
-            cmd = [
-                "psql",
-                "-h", os.getenv("DB_HOST"),
-                "-U", os.getenv("DB_USER"),
-                "-d", "postgres",
-                "-c", f"CREATE DATABASE {db_name}"
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                env={"PGPASSWORD": os.getenv("DB_PASSWORD")},
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, stderr = await process.communicate()
-
-            # Ignore error if database already exists
-            if process.returncode != 0 and "already exists" not in stderr.decode():
-                raise Exception(f"Database creation failed: {stderr.decode()}")
+            pool = await self._get_admin_pool()
+            async with pool.connection() as conn:
+                cursor = await conn.execute(
+                    "SELECT 1 FROM pg_database WHERE datname = %s", (db_name,)
+                )
+                if await cursor.fetchone():
+                    return
+                try:
+                    await conn.execute(
+                        sql.SQL("CREATE DATABASE {}").format(sql.Identifier(db_name))
+                    )
+                except errors.DuplicateDatabase:
+                    # Created concurrently between the check and the CREATE
+                    pass
 
         except Exception as e:
             logger.error(f"Database creation failed: {str(e)}")
@@ -226,25 +543,9 @@ class RestoreManager:
             bool: True if restoration verification is successful, False otherwise.
         """
         try:
-            cmd = [
-                "psql",
-                "-h", os.getenv("DB_HOST"),
-                "-U", os.getenv("DB_USER"),
-                "-d", db_name,
-                "-c", "SELECT COUNT(*) FROM information_schema.tables"
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                env={"PGPASSWORD": os.getenv("DB_PASSWORD")},
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                raise Exception(f"Restoration verification failed: {stderr.decode()}")
+            async with await psycopg.AsyncConnection.connect(self._conninfo(db_name)) as conn:
+                cursor = await conn.execute("SELECT COUNT(*) FROM information_schema.tables")
+                await cursor.fetchone()
 
             return True
 
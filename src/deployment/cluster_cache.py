@@ -0,0 +1,210 @@
+"""
+This module provides the ClusterStateCache class, an in-memory view of the cluster's nodes
+and pods kept current by Kubernetes watches.
+
+Readers such as the pre-deployment resource check query the cache instead of listing nodes
+and pods from the API server on every call.
+"""
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from kubernetes_asyncio import client, watch
+from kubernetes_asyncio.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+# Seconds between full relists, which repair any state a missed watch event left stale
+RELIST_INTERVAL = 60
+# Server-side timeout for each watch request; the watch is reopened when it expires
+WATCH_TIMEOUT = 300
+# Seconds to wait before reopening a watch that failed unexpectedly
+WATCH_RETRY_DELAY = 5
+
+_QUANTITY_SUFFIXES = {
+    "Ki": Decimal(2) ** 10, "Mi": Decimal(2) ** 20, "Gi": Decimal(2) ** 30,
+    "Ti": Decimal(2) ** 40, "Pi": Decimal(2) ** 50, "Ei": Decimal(2) ** 60,
+    "n": Decimal("1e-9"), "u": Decimal("1e-6"), "m": Decimal("1e-3"),
+    "k": Decimal("1e3"), "M": Decimal("1e6"), "G": Decimal("1e9"),
+    "T": Decimal("1e12"), "P": Decimal("1e15"), "E": Decimal("1e18"),
+}
+
+
+def parse_quantity(quantity) -> Decimal:
+    """Converts a Kubernetes resource quantity such as "500m" or "4Gi" to a number."""
+    if quantity is None:
+        return Decimal(0)
+    text = str(quantity)
+    for suffix in ("Ki", "Mi", "Gi", "Ti", "Pi", "Ei"):
+        if text.endswith(suffix):
+            return Decimal(text[:-2]) * _QUANTITY_SUFFIXES[suffix]
+    if text and text[-1] in _QUANTITY_SUFFIXES:
+        return Decimal(text[:-1]) * _QUANTITY_SUFFIXES[text[-1]]
+    return Decimal(text)
+
+
+class ClusterStateCache:
+    """
+    Watch-backed cache of the cluster's nodes and pods.
+
+    Attributes:
+        nodes (Dict[str, client.V1Node]): Nodes by name.
+        pods (Dict[Tuple[str, str], client.V1Pod]): Pods by (namespace, name).
+    """
+
+    def __init__(self, api_client: client.ApiClient):
+        self._core_v1 = client.CoreV1Api(api_client)
+        self.nodes: Dict[str, client.V1Node] = {}
+        self.pods: Dict[Tuple[str, str], client.V1Pod] = {}
+        self._lock = asyncio.Lock()
+        self._resource_versions: Dict[str, Optional[str]] = {"nodes": None, "pods": None}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Performs the initial list and starts the node watch, pod watch and periodic relist."""
+        if self._tasks:
+            return
+        await self._relist()
+        self._tasks = [
+            asyncio.create_task(self._watch("nodes")),
+            asyncio.create_task(self._watch("pods")),
+            asyncio.create_task(self._periodic_relist()),
+        ]
+
+    async def stop(self):
+        """Cancels the background watches."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def free_resources(self) -> Tuple[Decimal, Decimal]:
+        """
+        Computes unrequested capacity from the cached state.
+
+        Returns:
+            Tuple[Decimal, Decimal]: Free CPU in cores and free memory in bytes, summed over
+            schedulable nodes.
+        """
+        cpu = Decimal(0)
+        memory = Decimal(0)
+        schedulable = set()
+        for name, node in self.nodes.items():
+            if node.spec and node.spec.unschedulable:
+                continue
+            schedulable.add(name)
+            allocatable = (node.status and node.status.allocatable) or {}
+            cpu += parse_quantity(allocatable.get("cpu"))
+            memory += parse_quantity(allocatable.get("memory"))
+
+        for pod in self.pods.values():
+            if pod.spec.node_name not in schedulable or pod.status.phase in ("Succeeded", "Failed"):
+                continue
+            for container in pod.spec.containers:
+                requests = (container.resources and container.resources.requests) or {}
+                cpu -= parse_quantity(requests.get("cpu"))
+                memory -= parse_quantity(requests.get("memory"))
+
+        return cpu, memory
+
+    def _list_function(self, kind: str):
+        if kind == "nodes":
+            return self._core_v1.list_node
+        return self._core_v1.list_pod_for_all_namespaces
+
+    def _store(self, kind: str) -> Dict:
+        return self.nodes if kind == "nodes" else self.pods
+
+    @staticmethod
+    def _key(kind: str, obj):
+        if kind == "nodes":
+            return obj.metadata.name
+        return (obj.metadata.namespace, obj.metadata.name)
+
+    async def _relist(self):
+        """Replaces the cached nodes and pods with a fresh list."""
+        nodes, pods = await asyncio.gather(
+            self._core_v1.list_node(),
+            self._core_v1.list_pod_for_all_namespaces(),
+        )
+        async with self._lock:
+            self.nodes = {self._key("nodes", node): node for node in nodes.items}
+            self.pods = {self._key("pods", pod): pod for pod in pods.items}
+            self._resource_versions["nodes"] = nodes.metadata.resource_version
+            self._resource_versions["pods"] = pods.metadata.resource_version
+
+    async def _periodic_relist(self):
+        while True:
+            await asyncio.sleep(RELIST_INTERVAL)
+            try:
+                await self._relist()
+            except Exception as e:
+                logger.error(f"Cluster state relist failed: {str(e)}")
+
+    async def _watch(self, kind: str):
+        """Applies watch events for kind to the cache, reopening the watch as needed."""
+        while True:
+            try:
+                async with watch.Watch() as kind_watch:
+                    async for event in kind_watch.stream(
+                        self._list_function(kind),
+                        resource_version=self._resource_versions[kind],
+                        timeout_seconds=WATCH_TIMEOUT,
+                    ):
+                        await self._apply(kind, event)
+            except ApiException as e:
+                if e.status != 410:
+                    logger.error(f"Watch on {kind} failed: {str(e)}")
+                    await asyncio.sleep(WATCH_RETRY_DELAY)
+                    continue
+                # Our resource version was compacted away; start again from a fresh list
+                try:
+                    await self._relist()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as relist_error:
+                    # Keep the watch task alive; the next pass retries with the stale version,
+                    # gets another 410 and relists again
+                    logger.error(f"Relist for {kind} watch failed: {str(relist_error)}")
+                    await asyncio.sleep(WATCH_RETRY_DELAY)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Watch on {kind} failed: {str(e)}")
+                await asyncio.sleep(WATCH_RETRY_DELAY)
+
+    async def _apply(self, kind: str, event: Dict):
+        obj = event["object"]
+        key = self._key(kind, obj)
+        async with self._lock:
+            if event["type"] == "DELETED":
+                self._store(kind).pop(key, None)
+            else:
+                self._store(kind)[key] = obj
+            self._resource_versions[kind] = obj.metadata.resource_version
+
+
+_cluster_cache_start: Optional[asyncio.Future] = None
+
+
+async def _start_cluster_cache(api_client: client.ApiClient) -> ClusterStateCache:
+    cache = ClusterStateCache(api_client)
+    await cache.start()
+    return cache
+
+
+async def get_cluster_cache(api_client: client.ApiClient) -> ClusterStateCache:
+    """
+    Returns the process-wide cluster state cache, starting it on first use.
+
+    Concurrent first callers share one start-up; a failed start is retried on the next call.
+    """
+    global _cluster_cache_start
+    if _cluster_cache_start is None:
+        _cluster_cache_start = asyncio.ensure_future(_start_cluster_cache(api_client))
+    try:
+        return await asyncio.shield(_cluster_cache_start)
+    except Exception:
+        _cluster_cache_start = None
+        raise
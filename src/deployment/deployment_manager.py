@@ -9,14 +9,25 @@ and rolling back in case of failures.
 import asyncio
 import logging
 from pathlib import Path
-import json
-from typing import Dict, List
+import orjson
+from collections import deque
+from typing import Deque, Dict, List
 import subprocess
-from datetime import datetime
+from datetime import datetime, timezone
+from types import MappingProxyType
 import yaml
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _YamlLoader
 
 logger = logging.getLogger(__name__)
 
+# Seconds each rollback step may take before it is treated as failed
+ROLLBACK_STEP_TIMEOUT = 600
+# Number of recent deployment records kept in memory
+HISTORY_CACHE_SIZE = 100
+
 class DeploymentManager:
     """
     Advanced deployment automation system.
@@ -27,39 +38,59 @@ class DeploymentManager:
     the deployment, and rolling back in case of failure.
     """
 
+    # Plan steps that do not depend on version/environment, built once and shared read-only.
+    # Steps are identified by their action; depends_on lists the actions that must finish first.
+    _BACKUP_STEP = MappingProxyType({
+        'type': 'backup',
+        'action': 'create_backup',
+        'params': MappingProxyType({'full': True}),
+        'depends_on': ()
+    })
+    _RESTART_STEP = MappingProxyType({
+        'type': 'service',
+        'action': 'restart_services',
+        'params': MappingProxyType({'graceful': True}),
+        'depends_on': ('update_code', 'update_config')
+    })
+
+    # Step action -> name of the coroutine method that performs it
+    _STEP_HANDLERS = MappingProxyType({
+        'create_backup': '_backup_current_state',
+        'update_code': '_update_code',
+        'update_config': '_update_config',
+        'restart_services': '_restart_services',
+    })
+
     def __init__(self):
         """Initializes the DeploymentManager with necessary paths and configurations."""
         self.deployment_path: Path = Path('deployments')
         self.deployment_path.mkdir(exist_ok=True) # Create the directory if it doesn't exist
-        self.history_file = self.deployment_path / 'deployment_history.json'
+        self.history_file = self.deployment_path / 'deployment_history.jsonl'
         self.config = self._load_deployment_config()
+        self.recent_history = self._load_recent_history()
 
     async def deploy(self, version: str, environment: str):
-        """Execute deployment process"""
-        try:
-            # Pre-deployment checks
-            """
-            Executes the deployment process for a given version and environment.
+        """
+        Executes the deployment process for a given version and environment.
 
-            Args:
-                version (str): The version of the application to deploy.
-                environment (str): The target environment for the deployment.
+        Args:
+            version (str): The version of the application to deploy.
+            environment (str): The target environment for the deployment.
 
-            Raises:
-                ValueError: If pre-deployment checks fail or deployment verification fails.
-            """
+        Raises:
+            ValueError: If pre-deployment checks fail or deployment verification fails.
+        """
+        try:
+            # Pre-deployment checks
             if not await self._run_pre_deployment_checks():
                 raise ValueError("Pre-deployment checks failed")
 
             # Create deployment plan
             plan = await self._create_deployment_plan(version, environment)
 
-            # Backup current state
-            await self._backup_current_state()
-
-            # Execute deployment steps
-            for step in plan['steps']:
-                await self._execute_deployment_step(step)
+            # Execute deployment steps, independent ones concurrently; the plan's root step
+            # backs up the current state
+            await self._execute_plan(plan['steps'])
 
             # Run post-deployment verification
             if not await self._verify_deployment():
@@ -89,64 +120,115 @@ class DeploymentManager:
                 the version, environment, timestamp, and steps to execute.
 
         """
-
-        """Create detailed deployment plan"""
         return {
             'version': version,
             'environment': environment,
-            'timestamp': datetime.utcnow().isoformat(),
-            'steps': [
-                {
-                    'type': 'backup',
-                    'action': 'create_backup',
-                    'params': {'full': True}
-                },
-                {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'steps': (
+                self._BACKUP_STEP,
+                MappingProxyType({
                     'type': 'update',
                     'action': 'update_code',
-                    'params': {'version': version}
-                },
-                {
+                    'params': MappingProxyType({'version': version}),
+                    'depends_on': ('create_backup',)
+                }),
+                MappingProxyType({
                     'type': 'config',
                     'action': 'update_config',
-                    'params': {'env': environment}
-                },
-                {
-                    'type': 'service',
-                    'action': 'restart_services',
-                    'params': {'graceful': True}
-                }
-            ]
+                    'params': MappingProxyType({'env': environment}),
+                    'depends_on': ('create_backup',)
+                }),
+                self._RESTART_STEP,
+            )
         }
 
-    async def _verify_deployment(self) -> bool:
+    async def _execute_plan(self, steps):
         """
-        Verifies the success of the deployment by checking service health,
-        database migrations, system metrics, and API endpoints.
+        Executes plan steps as a dependency graph.
 
-        Returns:
-            bool: True if the deployment is successful, False otherwise.
+        Each step starts as soon as the steps named in its depends_on have completed, so the
+        default plan runs backup, then code and config updates concurrently, then the restart.
+        Steps must be listed after their dependencies. If any step fails the remaining ones are
+        cancelled and the error is raised.
+
+        Args:
+            steps: The plan steps, in dependency order.
+
+        Raises:
+            ValueError: If a step repeats an action or depends on one not listed before it.
+                Nothing is started in that case.
         """
+        steps = tuple(steps)
+        listed = set()
+        for step in steps:
+            action = step['action']
+            if action in listed:
+                raise ValueError(f"Duplicate deployment step: {action}")
+            unknown = set(step['depends_on']) - listed
+            if unknown:
+                raise ValueError(f"Step {action} depends on unknown steps: {sorted(unknown)}")
+            listed.add(action)
+
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def run(step):
+            await asyncio.gather(*(tasks[dependency] for dependency in step['depends_on']))
+            await self._execute_deployment_step(step)
+
+        for step in steps:
+            tasks[step['action']] = asyncio.ensure_future(run(step))
 
-        """Verify deployment success"""
         try:
-            # Check service health
-            if not await self._check_service_health():
-                return False
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+    async def _execute_deployment_step(self, step):
+        """
+        Executes a single deployment step by dispatching on its action.
 
-            # Verify database migrations
-            if not await self._verify_database_migrations():
-                return False
+        Args:
+            step: The step mapping, with 'action' and 'params' keys.
 
-            # Check system metrics
-            if not await self._check_system_metrics():
-                return False
+        Raises:
+            ValueError: If the step action is unknown.
+        """
+        handler_name = self._STEP_HANDLERS.get(step['action'])
+        if handler_name is None:
+            raise ValueError(f"Unknown deployment step: {step['action']}")
+        await getattr(self, handler_name)(**step['params'])
+        logger.info(f"Deployment step completed: {step['action']}")
 
-            # Verify API endpoints
-            if not await self._verify_api_endpoints():
-                return False
+    async def _verify_deployment(self) -> bool:
+        """
+        Verifies the success of the deployment by checking service health,
+        database migrations, system metrics, and API endpoints.
 
-            return True
+        Returns:
+            bool: True if the deployment is successful, False otherwise.
+        """
+        try:
+            # Service health, database migrations, system metrics and API endpoints are independent
+            checks = {
+                'service health': self._check_service_health(),
+                'database migrations': self._verify_database_migrations(),
+                'system metrics': self._check_system_metrics(),
+                'api endpoints': self._verify_api_endpoints(),
+            }
+            results = await asyncio.gather(*checks.values(), return_exceptions=True)
+
+            passed = True
+            for name, result in zip(checks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Deployment check '{name}' raised: {str(result)}")
+                    passed = False
+                elif not result:
+                    logger.error(f"Deployment check '{name}' failed")
+                    passed = False
+            return passed
         except Exception as e:
             logger.error(f"Deployment verification failed: {str(e)}")
             return False
@@ -155,24 +237,34 @@ class DeploymentManager:
         """
         Rolls back the deployment to the previous state in case of failure.
 
+        Code, database and configuration are restored concurrently since they do not depend
+        on each other; services are restarted once all three have finished.
+
         Raises:
             Exception: If any step in the rollback process fails.
         """
-        """Roll back deployment"""
         try:
             logger.info("Initiating rollback...")
 
-            # Restore code version
-            await self._restore_code_version()
-
-            # Restore database
-            await self._restore_database()
-
-            # Restore configuration
-            await self._restore_configuration()
+            restores = {
+                'code version': self._restore_code_version(),
+                'database': self._restore_database(),
+                'configuration': self._restore_configuration(),
+            }
+            results = await asyncio.gather(
+                *(asyncio.wait_for(step, ROLLBACK_STEP_TIMEOUT) for step in restores.values()),
+                return_exceptions=True
+            )
+            failed = [
+                f"{name}: {result!r}"
+                for name, result in zip(restores, results)
+                if isinstance(result, Exception)
+            ]
+            if failed:
+                raise RuntimeError(f"Restore steps failed: {'; '.join(failed)}")
 
             # Restart services
-            await self._restart_services()
+            await asyncio.wait_for(self._restart_services(), ROLLBACK_STEP_TIMEOUT)
 
             logger.info("Rollback completed successfully")
 
@@ -180,9 +272,50 @@ class DeploymentManager:
             logger.error(f"Rollback failed: {str(e)}")
             raise
 
-    def _load_deployment_config(self):
-        """ Placeholder for config loading"""
-        return {}
+    async def _update_deployment_history(self, version: str, environment: str):
+        """
+        Appends a deployment record to the history log.
+
+        The log is JSON Lines, so each deployment costs one appended line rather than a
+        rewrite of the whole history; the newest records are also kept in memory.
+
+        Args:
+            version (str): The deployed version.
+            environment (str): The environment deployed to.
+        """
+        record = {
+            'version': version,
+            'environment': environment,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }
+        await asyncio.to_thread(self._append_history_line, orjson.dumps(record) + b'\n')
+        self.recent_history.append(record)
+
+    def _append_history_line(self, line: bytes) -> None:
+        """Appends one line to the history log, opening and closing the file around the write."""
+        with self.history_file.open('ab') as f:
+            f.write(line)
+
+    def _load_recent_history(self) -> Deque[Dict]:
+        """Loads the newest HISTORY_CACHE_SIZE records from the history log."""
+        if not self.history_file.exists():
+            return deque(maxlen=HISTORY_CACHE_SIZE)
+        with self.history_file.open('rb') as f:
+            lines = deque(f, maxlen=HISTORY_CACHE_SIZE)
+        return deque((orjson.loads(line) for line in lines if line.strip()), maxlen=HISTORY_CACHE_SIZE)
+
+    def _load_deployment_config(self) -> Dict:
+        """
+        Loads deployments/deployment_config.yaml with the libyaml-backed loader.
+
+        Returns:
+            Dict: The deployment configuration, or an empty dict if the file does not exist.
+        """
+        config_file = self.deployment_path / 'deployment_config.yaml'
+        if not config_file.exists():
+            return {}
+        with config_file.open('rb') as f:
+            return yaml.load(f, Loader=_YamlLoader) or {}
 
 if __name__ == "__main__":
     deployment = DeploymentManager()
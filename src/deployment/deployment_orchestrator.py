@@ -7,19 +7,41 @@ including Kubernetes, databases, and cache systems.
 """
 import logging
 from pathlib import Path
-import json
-from typing import Dict, List
+import aiofiles
+import orjson
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import asyncio
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 import yaml
-import kubernetes
-from kubernetes import client, config
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _YamlLoader
+from kubernetes_asyncio import client, config, watch
+from kubernetes_asyncio.client.rest import ApiException
 import os
 
+from .cluster_cache import get_cluster_cache, parse_quantity
+
 logger = logging.getLogger(__name__)
 
 # Set the project ID
 PROJECT_ID = os.getenv('GCP_PROJECT_ID', 'secureai-nexus')
+# Default cap on deployment steps running at once
+DEFAULT_STEP_CONCURRENCY = 8
+# Seconds to wait for a rollout to become ready during verification
+DEFAULT_ROLLOUT_TIMEOUT = 600
+# Default cap on concurrent Kubernetes write calls
+DEFAULT_K8S_CONCURRENCY = 16
+
+
+@lru_cache(maxsize=8)
+def _load_yaml_cached(path_str: str, mtime_ns: int) -> Dict:
+    """Parses a YAML file; keyed on mtime so an edited file is re-read."""
+    with open(path_str, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
 
 
 class DeploymentOrchestrator:
@@ -32,23 +54,97 @@ class DeploymentOrchestrator:
     post-deployment verification, and handling failures.
     """
 
+    # Step type -> name of the coroutine method that performs it
+    _STEP_HANDLERS = MappingProxyType({
+        'kubernetes': '_deploy_to_kubernetes',
+        'database': '_update_database',
+        'configuration': '_update_configuration',
+        'cache': '_update_cache',
+    })
+
     def __init__(self):
         """
         Initializes the DeploymentOrchestrator.
 
-        Sets up the deployment directory, loads the deployment configuration,
-        and initializes the Kubernetes client.
+        Sets up the deployment directory and loads the deployment configuration. The
+        Kubernetes client is created on first use, since loading its configuration is async.
         """
         self.deployment_path = Path('deployments')
         self.deployment_path.mkdir(exist_ok=True)
         self.config = self._load_deployment_config()
-        self.k8s_client = self._initialize_kubernetes()
+        self.k8s_client = None
+        self._k8s_semaphore = None
+        # In-flight deployments by (model_id, version), shared by duplicate requests
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Step type -> bound handler, resolved once rather than per step. Step types whose
+        # handler has not been implemented yet are left out, so plans using them are rejected.
+        self._handlers = {
+            step_type: getattr(self, name)
+            for step_type, name in self._STEP_HANDLERS.items()
+            if hasattr(self, name)
+        }
+
+    async def _initialize_kubernetes(self) -> client.ApiClient:
+        """
+        Loads the in-cluster configuration, falling back to the local kubeconfig.
+
+        Returns:
+            client.ApiClient: An async API client sharing one connection pool.
+        """
+        try:
+            config.load_incluster_config()
+        except config.ConfigException:
+            await config.load_kube_config()
+        return client.ApiClient()
+
+    async def _get_k8s_client(self) -> client.ApiClient:
+        """Returns the Kubernetes API client, initializing it on first use."""
+        if self.k8s_client is None:
+            self.k8s_client = await self._initialize_kubernetes()
+            # Bounds bursts of write calls against API server priority and fairness limits
+            self._k8s_semaphore = asyncio.Semaphore(
+                self.config.get('k8s_max_concurrency', DEFAULT_K8S_CONCURRENCY)
+            )
+        return self.k8s_client
+
+    async def _deploy_to_kubernetes(self, step: Dict):
+        """
+        Applies a Deployment manifest, replacing the existing Deployment or creating it.
+
+        Args:
+            step (Dict): The deployment step; 'manifest' holds the Deployment body.
+        """
+        apps_v1 = client.AppsV1Api(await self._get_k8s_client())
+        manifest = step['manifest']
+        namespace = manifest.get('metadata', {}).get('namespace', self.config.get('namespace', 'default'))
+        name = manifest['metadata']['name']
+        async with self._k8s_semaphore:
+            try:
+                await apps_v1.replace_namespaced_deployment(name, namespace, manifest)
+            except ApiException as e:
+                if e.status != 404:
+                    raise
+                await apps_v1.create_namespaced_deployment(namespace, manifest)
 
     async def deploy_model(self, model_id: str, version: str) -> Dict:
         """
         Deploys a model to production.
         Manages the entire deployment lifecycle, including pre-checks, execution, and verification.
+
+        Concurrent calls for the same model and version share a single deployment and all
+        receive its record (or its exception).
         """
+        key = (model_id, version)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._deploy_model(model_id, version))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller must not cancel the deployment other callers are waiting on
+        return await asyncio.shield(task)
+
+    async def _deploy_model(self, model_id: str, version: str) -> Dict:
+        """Runs a single deployment of model_id at version; see deploy_model."""
         try:
             # Create deployment record
             deployment_id = self._generate_deployment_id()
@@ -56,7 +152,7 @@ class DeploymentOrchestrator:
                 'deployment_id': deployment_id,
                 'model_id': model_id,
                 'version': version,
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': datetime.utcnow(),
                 'status': 'in_progress'
             }
 
@@ -65,11 +161,10 @@ class DeploymentOrchestrator:
                 raise ValueError("Pre-deployment checks failed")
 
             # Create deployment plan
-            deployment_plan = await self._create_deployment_plan(model_id, version)
+            deployment_plan = self._create_deployment_plan(model_id, version)
 
-            # Execute deployment steps
-            for step in deployment_plan['steps']:
-                await self._execute_deployment_step(step)
+            # Execute deployment steps, independent ones concurrently
+            await self._execute_plan(deployment_plan)
 
             # Run post-deployment verification
             if not await self._verify_deployment(deployment_id):
@@ -101,27 +196,156 @@ class DeploymentOrchestrator:
         Raises:
             Exception: If any error occurs during the pre-deployment checks."""
         try:
-            # Check model artifacts
-            if not await self._verify_model_artifacts(model_id, version):
-                return False
+            # The checks are independent, so run them concurrently
+            checks = {
+                'model artifacts': self._verify_model_artifacts(model_id, version),
+                'resource availability': self._check_resource_availability(),
+                'dependencies': self._verify_dependencies(),
+                'security requirements': self._verify_security_requirements(),
+            }
+            results = await asyncio.gather(*checks.values(), return_exceptions=True)
 
-            # Check resource availability
-            if not await self._check_resource_availability():
-                return False
+            for name, result in zip(checks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Pre-deployment check '{name}' raised: {str(result)}")
+                elif result is not True:
+                    logger.error(f"Pre-deployment check '{name}' failed")
+            return all(result is True for result in results)
 
-            # Check dependencies
-            if not await self._verify_dependencies():
-                return False
+        except Exception as e:
+            logger.error(f"Pre-deployment checks failed: {str(e)}")
+            return False
 
-            # Check security requirements
-            if not await self._verify_security_requirements():
-                return False
+    async def _save_deployment_record(self, record: Dict):
+        """
+        Writes a deployment record to deployments/<deployment_id>.json.
 
-            return True
+        orjson serializes the record's datetimes directly, as RFC 3339 UTC timestamps.
 
-        except Exception as e:
-            logger.error(f"Pre-deployment checks failed: {str(e)}")
+        Args:
+            record (Dict): The deployment record.
+        """
+        path = self.deployment_path / f"{record['deployment_id']}.json"
+        async with aiofiles.open(path, 'wb') as f:
+            await f.write(orjson.dumps(record, option=orjson.OPT_NAIVE_UTC))
+
+    async def _check_resource_availability(self) -> bool:
+        """
+        Checks that the cluster has room for the deployment.
+
+        Free capacity is computed from the watch-backed cluster state cache, so the check makes
+        no API calls once the cache is warm. Requirements come from the 'required_cpu' and
+        'required_memory' config entries, as Kubernetes quantities.
+
+        Returns:
+            bool: True if unrequested CPU and memory cover the requirements.
+        """
+        cache = await get_cluster_cache(await self._get_k8s_client())
+        free_cpu, free_memory = cache.free_resources()
+        required_cpu = parse_quantity(self.config.get('required_cpu', '0'))
+        required_memory = parse_quantity(self.config.get('required_memory', '0'))
+        if free_cpu < required_cpu or free_memory < required_memory:
+            logger.error(
+                f"Insufficient cluster resources: {free_cpu} CPU / {free_memory} bytes free, "
+                f"{required_cpu} CPU / {required_memory} bytes required"
+            )
             return False
+        return True
+
+    async def _create_deployment_plan(self, model_id: str, version: str) -> AsyncIterator[Dict]:
+        """
+        Yields the deployment steps for a model version as they are prepared.
+
+        Steps are built from the 'steps' templates in the deployment configuration. Because the
+        plan is a generator, execution can begin on the first steps while later ones are still
+        being planned.
+
+        Args:
+            model_id (str): The ID of the model to be deployed.
+            version (str): The version of the model to be deployed.
+        """
+        for template in self.config.get('steps', ()):
+            yield {**template, 'model_id': model_id, 'version': version}
+
+    async def _execute_plan(self, steps: AsyncIterator[Dict]):
+        """
+        Executes deployment steps as a dependency graph while the plan is still being produced.
+
+        Each step may name the steps it needs in 'depends_on'; a step without the key depends
+        on the step before it, so plans that do not declare dependencies still run serially.
+        Dependencies must name steps yielded earlier, and every step type must have a handler;
+        each step is checked as it arrives, before it is scheduled. Ready steps are started as soon as their
+        dependencies complete, at most 'step_concurrency' (default DEFAULT_STEP_CONCURRENCY)
+        at a time.
+
+        Args:
+            steps (AsyncIterator[Dict]): The plan steps, each with a unique 'name'.
+
+        Raises:
+            ValueError: If a step reuses a name, has an unsupported type, or depends on a step
+                not yielded before it.
+            Exception: The first step failure; steps still running are cancelled.
+        """
+        semaphore = asyncio.Semaphore(self.config.get('step_concurrency', DEFAULT_STEP_CONCURRENCY))
+
+        async def run(step: Dict):
+            async with semaphore:
+                await self._execute_deployment_step(step)
+
+        step_iter = steps.__aiter__()
+        next_step: Optional[asyncio.Future] = asyncio.ensure_future(step_iter.__anext__())
+        known = set()
+        previous = None
+        pending: Dict[str, Tuple[Dict, List[str]]] = {}
+        completed = set()
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while next_step is not None or pending or running:
+                ready = [name for name, (_, deps) in pending.items() if completed.issuperset(deps)]
+                for name in ready:
+                    step, _ = pending.pop(name)
+                    running[asyncio.create_task(run(step))] = name
+
+                waiting = set(running)
+                if next_step is not None:
+                    waiting.add(next_step)
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if next_step in done:
+                    try:
+                        step = next_step.result()
+                    except StopAsyncIteration:
+                        next_step = None
+                    else:
+                        name = step['name']
+                        if name in known:
+                            raise ValueError(f"Duplicate deployment step: {name}")
+                        if step['type'] not in self._handlers:
+                            raise ValueError(f"Unsupported deployment step type: {step['type']}")
+                        depends_on = list(step.get('depends_on', [previous] if previous else []))
+                        unknown = set(depends_on) - known
+                        if unknown:
+                            raise ValueError(f"Step {name} depends on unknown steps: {sorted(unknown)}")
+                        known.add(name)
+                        pending[name] = (step, depends_on)
+                        previous = name
+                        next_step = asyncio.ensure_future(step_iter.__anext__())
+
+                for task in done:
+                    if task in running:
+                        name = running.pop(task)
+                        task.result()  # Re-raise the step's failure
+                        completed.add(name)
+        finally:
+            leftovers = list(running)
+            if next_step is not None:
+                leftovers.append(next_step)
+            for task in leftovers:
+                task.cancel()
+            if leftovers:
+                await asyncio.gather(*leftovers, return_exceptions=True)
+            if hasattr(step_iter, 'aclose'):
+                await step_iter.aclose()
 
     async def _execute_deployment_step(self, step: Dict):
         """
@@ -132,18 +356,13 @@ class DeploymentOrchestrator:
                          It should contain 'type' and 'name' keys.
 
         Raises:
-            ValueError: If the step type is unknown.
+            ValueError: If no handler is implemented for the step type.
             Exception: If an error occurs during the step execution.
         """
         try:
-            if step['type'] == 'kubernetes':
-                await self._deploy_to_kubernetes(step)
-            elif step['type'] == 'database':
-                await self._update_database(step)
-            elif step['type'] == 'configuration':
-                await self._update_configuration(step)
-            elif step['type'] == 'cache':
-                await self._update_cache(step)
+            if step['type'] not in self._handlers:
+                raise ValueError(f"Unsupported deployment step type: {step['type']}")
+            await self._handlers[step['type']](step)
 
             logger.info(f"Deployment step completed: {step['name']}")
 
@@ -151,18 +370,79 @@ class DeploymentOrchestrator:
             logger.error(f"Deployment step failed: {str(e)}")
             raise
 
-    def _load_deployment_config(self):
+    async def _verify_deployment(self, deployment_id: str) -> bool:
         """
-        Loads the deployment configuration from a file.
+        Waits for the Kubernetes rollout to become ready.
+
+        Readiness is observed through a single watch on the Deployment, so status changes are
+        pushed by the API server rather than polled.
+
+        Args:
+            deployment_id (str): The deployment being verified.
 
         Returns:
-            Dict: The loaded deployment configuration.
+            bool: True if all replicas are updated and ready within the timeout.
+        """
+        namespace = self.config.get('namespace', 'default')
+        name = self.config.get('deployment_name', 'secureai-nexus')
+        timeout = self.config.get('rollout_timeout', DEFAULT_ROLLOUT_TIMEOUT)
+        try:
+            ready = await self._wait_for_rollout(name, namespace, timeout)
+            if not ready:
+                logger.error(f"Deployment {deployment_id}: {namespace}/{name} not ready after {timeout}s")
+            return ready
+        except Exception as e:
+            logger.error(f"Deployment verification failed: {str(e)}")
+            return False
 
-        Raises:
-            FileNotFoundError: If the configuration file is missing."""
-        return {
-            'key': 'value'  # Example configuration
-        }
+    async def _wait_for_rollout(self, name: str, namespace: str, timeout: int) -> bool:
+        """
+        Waits until the named Deployment's rollout is complete or the watch times out.
+
+        The watch starts with the current state of the Deployment, so an already finished
+        rollout returns immediately.
+        """
+        apps_v1 = client.AppsV1Api(await self._get_k8s_client())
+        async with watch.Watch() as rollout_watch:
+            async for event in rollout_watch.stream(
+                apps_v1.list_namespaced_deployment,
+                namespace=namespace,
+                field_selector=f"metadata.name={name}",
+                timeout_seconds=timeout,
+            ):
+                if event['type'] == 'DELETED':
+                    return False
+                if self._rollout_complete(event['object']):
+                    return True
+        return False
+
+    @staticmethod
+    def _rollout_complete(deployment) -> bool:
+        """Whether the controller has observed the latest spec and all replicas are updated and ready."""
+        desired = deployment.spec.replicas or 0
+        status = deployment.status
+        return (
+            (status.observed_generation or 0) >= (deployment.metadata.generation or 0)
+            and (status.updated_replicas or 0) == desired
+            and (status.ready_replicas or 0) == desired
+        )
+
+    def _load_deployment_config(self) -> Dict:
+        """
+        Loads the deployment configuration from deployments/deployment_config.yaml.
+
+        The file is parsed with the libyaml-backed loader, and the result is reused until the
+        file's modification time changes.
+
+        Returns:
+            Dict: The loaded deployment configuration, or an empty dict if the file is missing."""
+        config_file = self.deployment_path / 'deployment_config.yaml'
+        try:
+            mtime_ns = config_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        # Copy so callers cannot mutate the cached parse
+        return dict(_load_yaml_cached(str(config_file), mtime_ns))
 
 if __name__ == "__main__":
     orchestrator = DeploymentOrchestrator()
@@ -2,28 +2,103 @@
 This module provides the DeploymentSummary class to manage and record the summary of a deployment process.
 It includes tracking the deployment status, stages, start and end times, and sending notifications.
 """
+import asyncio
+import contextlib
 import logging
+import os
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.notifications.deployment_notifier import notifier
 from src.scripts.rollback_manager import rollback_manager
 
 logger = logging.getLogger(__name__)
 
+# Fixed for the life of the process
+VERSION = os.environ.get('VERSION', 'latest')
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'production')
+
+# Most stage updates sent in one batched notification
+NOTIFY_BATCH_SIZE = 20
+
+_now_iso_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """The current UTC time in ISO format, reused for calls within the same millisecond."""
+    global _now_iso_cache
+    now_ms = time.time_ns() // 1_000_000
+    if now_ms != _now_iso_cache[0]:
+        _now_iso_cache = (now_ms, datetime.utcfromtimestamp(now_ms / 1000).isoformat())
+    return _now_iso_cache[1]
+
 
 class DeploymentSummary:
     """
     Manages and records the summary of a deployment, including version, environment, stages,
     and overall status.
     """
+    __slots__ = ('start_time', 'status', '_notify_q', '_notify_task', '_notify_loop')
+
     def __init__(self):
         self.start_time = datetime.utcnow()
         self.status = {
-            'version': os.getenv('VERSION', 'latest'),
-            'environment': os.getenv('ENVIRONMENT', 'production'),
+            'version': VERSION,
+            'environment': ENVIRONMENT,
             'stages': {},
             'overall_status': 'pending'
         }
+        # Stage notifications are queued and sent in batches by a background task, started on
+        # the first recorded stage so the module-level instance needs no running loop. The queue
+        # and task belong to the loop they were created on and are recreated for any other loop.
+        self._notify_q: Optional[asyncio.Queue] = None
+        self._notify_task: Optional[asyncio.Task] = None
+        self._notify_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _queue(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._notify_loop is not loop or self._notify_task is None or self._notify_task.done():
+            self._stop_drain()
+            self._notify_q = asyncio.Queue()
+            self._notify_task = loop.create_task(self._drain(self._notify_q))
+            self._notify_loop = loop
+        return self._notify_q
+
+    def _stop_drain(self):
+        """Cancels the drain task, if its loop can still run the cancellation, and forgets it."""
+        task, loop = self._notify_task, self._notify_loop
+        if task is not None and not task.done() and not loop.is_closed():
+            task.cancel()
+        self._notify_q = self._notify_task = self._notify_loop = None
+
+    async def _drain(self, queue: asyncio.Queue):
+        """Sends queued stage updates, batching whatever has accumulated since the last send."""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < NOTIFY_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await notifier.notify_batch(batch)
+            except Exception as e:
+                # Keep draining; a failed notification must not stall later stages or flush()
+                logger.error(f"Failed to send {len(batch)} stage notifications: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def flush(self):
+        """Waits until every recorded stage has been notified, then stops the drain task."""
+        if self._notify_q is None:
+            return
+        if self._notify_loop is asyncio.get_running_loop():
+            await self._notify_q.join()
+            task = self._notify_task
+            self._stop_drain()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        else:
+            # Queued on a loop that is gone or not this one; those updates can no longer be sent
+            self._stop_drain()
 
     async def record_stage(
         self, stage: str, status: str, details: Dict[str, Any] = None
@@ -35,35 +110,38 @@ class DeploymentSummary:
             stage (str): The name of the deployment stage.
             status (str): The status of the stage (e.g., 'success', 'failure').
             details (Dict[str, Any], optional): Additional details about the stage. Defaults to None.
+
+        The notification is queued rather than sent inline, so recording a stage does not wait
+        on the network.
         """
-        """Record deployment stage status"""
         self.status['stages'][stage] = {
             'status': status,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': _now_iso(),
             'details': details or {}
         }
 
-        # Send notification
-        await notifier.notify_deployment_status({
+        # Queue notification
+        self._queue().put_nowait({
             'stage': stage,
             'status': status,
             'details': details,
             'environment': self.status['environment']
         })
 
-    def get_summary(self) -> Dict[str, Any]:    
+    def get_summary(self) -> Dict[str, Any]:
         """
         Returns a summary of the deployment.
 
+        Stage notifications may still be in flight; await flush() first to wait for them.
+
         Returns:
             Dict[str, Any]: A dictionary containing the deployment summary.
         """
-        """Get deployment summary"""
         return {
             'version': self.status['version'],
             'environment': self.status['environment'],
             'start_time': self.start_time.isoformat(),
-            'end_time': datetime.utcnow().isoformat(),
+            'end_time': _now_iso(),
             'stages': self.status['stages'],
             'overall_status': self.status['overall_status']
         }
@@ -3,17 +3,44 @@ This module provides tools for verifying the deployment environment and ensuring
 that all required resources and tools are available and properly configured.
 """
 import logging
+import os
 import shutil
 import psutil
 import asyncio
-from typing import Dict, List, Tuple, Any
+import time
+import weakref
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Seconds a tool lookup is reused; resource figures are instead snapshotted per verify_all
+TOOL_PROBE_TTL = 60.0
+
+# IAM permissions the deployment needs on the GCP project, checked in one testIamPermissions call
+REQUIRED_GCP_PERMISSIONS = (
+    "container.deployments.create",
+    "container.deployments.update",
+    "storage.objects.create",
+    "storage.objects.get",
+    "cloudsql.instances.connect",
+    "secretmanager.versions.access",
+)
+# (verb, API group, resource) access the deployment needs in the target namespace
+REQUIRED_K8S_ACCESS = (
+    ("create", "apps", "deployments"),
+    ("update", "apps", "deployments"),
+    ("get", "", "pods"),
+    ("create", "", "services"),
+    ("get", "", "configmaps"),
+    ("get", "", "secrets"),
+)
+# Access reviews in flight at once against the API server
+K8S_REVIEW_CONCURRENCY = 4
+
+@dataclass(frozen=True)
 class SystemRequirements:
     """
     Defines the minimum system requirements for the deployment environment.
@@ -22,9 +49,12 @@ class SystemRequirements:
     min_memory_gb: int = 8
     min_storage_gb: int = 100
     min_network_mbps: int = 1000
-    required_tools: List[str] = (
+    # Verification checks allowed to run at once across all verifiers sharing this limit;
+    # the default lets one verify_all run its four checks together
+    max_concurrent_verify: int = 4
+    required_tools: FrozenSet[str] = frozenset({
         "kubectl", "docker", "gcloud", "psql", "python3"
-        )
+    })
 
     def __post_init__(self):
         """Validate the requirements"""
@@ -33,9 +63,55 @@ class SystemRequirements:
 
 
 class DeploymentVerifier:
+    # Semaphores per event loop, keyed by max_concurrent_verify. Verifiers on one loop with the
+    # same limit share a semaphore, so overlapping reports do not multiply outbound API calls.
+    _sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Semaphore]]" = (
+        weakref.WeakKeyDictionary()
+    )
+
     def __init__(self):
         self.requirements = SystemRequirements()
-        self.fixes_applied = []
+        # A set, so repeated verify_all runs don't record the same fix twice
+        self.fixes_applied: Set[str] = set()
+        self._probe_cache: Dict[str, Tuple[float, Any]] = {}
+        self._probe: Optional[Dict[str, int]] = None
+        # Tool presence as of the last verify_tools run, reused by generate_report
+        self._tools_status: Optional[Dict[str, bool]] = None
+
+    def _cached(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        """Return fn(), reusing the previous result for key if it is younger than ttl seconds."""
+        now = time.monotonic()
+        entry = self._probe_cache.get(key)
+        if entry is None or now - entry[0] > ttl:
+            entry = (now, fn())
+            self._probe_cache[key] = entry
+        return entry[1]
+
+    def _which(self, tool: str) -> bool:
+        return bool(self._cached(f"which:{tool}", TOOL_PROBE_TTL, lambda: shutil.which(tool)))
+
+    def _resource_probe(self) -> Dict[str, int]:
+        """
+        Returns the CPU, memory and disk snapshot, probing the system if none has been taken.
+
+        verify_all takes a fresh snapshot; the checks and generate_report then all read it.
+        """
+        if self._probe is None:
+            self._probe = {
+                "cpu": psutil.cpu_count(),
+                "mem_b": psutil.virtual_memory().total,
+                "disk_b": shutil.disk_usage("/").total,
+            }
+        return self._probe
+
+    def _cpu_cores(self) -> int:
+        return self._resource_probe()["cpu"]
+
+    def _memory_gb(self) -> float:
+        return self._resource_probe()["mem_b"] / (1024**3)
+
+    def _storage_gb(self) -> float:
+        return self._resource_probe()["disk_b"] / (1024**3)
 
     async def verify_all(self) -> Tuple[bool, List[str]]:
         """
@@ -45,18 +121,46 @@ class DeploymentVerifier:
         This method orchestrates the verification of system resources, tools,
         permissions, and connectivity. It runs each verification check concurrently
         and gathers the results to determine overall success and which fixes were
-        applied.
+        applied. As soon as one check fails the remaining ones are cancelled, since the
+        overall result is already decided.
         """
-        checks = [
-            self.verify_system_resources(),
-            self.verify_tools(),
-            self.verify_permissions(),
-            self.verify_connectivity()
-        ]
+        # One resource snapshot per run
+        self._probe = None
+        self._tools_status = None
+        # statvfs and /proc reads block; keep them off the event loop too
+        await asyncio.to_thread(self._resource_probe)
+
+        pending = {
+            asyncio.ensure_future(self._guarded(check)) for check in (
+                self.verify_system_resources(),
+                self.verify_tools(),
+                self.verify_permissions(),
+                self.verify_connectivity()
+            )
+        }
 
-        results = await asyncio.gather(*checks, return_exceptions=True)
-        success = all(not isinstance(r, Exception) and r for r in results)
-        return success, self.fixes_applied
+        success = True
+        while pending and success:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None or not task.result():
+                    success = False
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return success, sorted(self.fixes_applied)
+
+    async def _guarded(self, coro):
+        """Awaits coro while holding a slot of the semaphore for this loop and this verifier's limit."""
+        limit = self.requirements.max_concurrent_verify
+        sems = DeploymentVerifier._sems.setdefault(asyncio.get_running_loop(), {})
+        sem = sems.get(limit)
+        if sem is None:
+            sem = sems[limit] = asyncio.Semaphore(limit)
+        async with sem:
+            return await coro
 
     async def verify_system_resources(self) -> bool:
         """
@@ -69,30 +173,44 @@ class DeploymentVerifier:
         Returns:
             bool: True if requirements are met or fixed, False otherwise.
         """
+        applied: List[str] = []
         try:
+            if self._probe is None:
+                # Called outside verify_all; take the snapshot off the event loop
+                await asyncio.to_thread(self._resource_probe)
+            requirements = self.requirements
+            cpu_cores = self._cpu_cores()
+            memory_gb = self._memory_gb()
+            storage_gb = self._storage_gb()
+
+            # Common case: every minimum is met and none of the fix paths are entered
+            if (
+                cpu_cores >= requirements.min_cpu_cores
+                and memory_gb >= requirements.min_memory_gb
+                and storage_gb >= requirements.min_storage_gb
+            ):
+                return True
+
             # Check CPU
-            cpu_cores = psutil.cpu_count()
-            if cpu_cores < self.requirements.min_cpu_cores:
+            if cpu_cores < requirements.min_cpu_cores:
                 if await self._request_more_cpu():
-                    self.fixes_applied.append("Increased CPU allocation")
+                    applied.append("Increased CPU allocation")
                 else:
                     logger.error(f"Insufficient CPU cores: {cpu_cores}")
                     return False
 
             # Check Memory
-            memory_gb = psutil.virtual_memory().total / (1024**3)
-            if memory_gb < self.requirements.min_memory_gb:
+            if memory_gb < requirements.min_memory_gb:
                 if await self._request_more_memory():
-                    self.fixes_applied.append("Increased memory allocation")
+                    applied.append("Increased memory allocation")
                 else:
                     logger.error(f"Insufficient memory: {memory_gb}GB")
                     return False
 
             # Check Storage
-            storage_gb = shutil.disk_usage("/").total / (1024**3)
-            if storage_gb < self.requirements.min_storage_gb:
+            if storage_gb < requirements.min_storage_gb:
                 if await self._expand_storage():
-                    self.fixes_applied.append("Expanded storage")
+                    applied.append("Expanded storage")
                 else:
                     logger.error(f"Insufficient storage: {storage_gb}GB")
                     return False
@@ -103,6 +221,12 @@ class DeploymentVerifier:
             logger.error(f"Resource verification failed: {str(e)}")
             return False
 
+        finally:
+            self.fixes_applied.update(applied)
+            # A fix changed the resources, so the snapshot no longer describes the system
+            if applied:
+                self._probe = None
+
     async def verify_tools(self) -> bool:
         """
         Verify and install required tools.
@@ -114,16 +238,25 @@ class DeploymentVerifier:
         Returns:
             bool: True if all tools are present or installed, False otherwise.
         """
-        missing_tools = []
-        for tool in self.requirements.required_tools:
-            if not shutil.which(tool):
-                missing_tools.append(tool)
+        required = self.requirements.required_tools
+        tools = sorted(required)
+        # Each lookup walks PATH; run them in worker threads so the walks overlap
+        found = await asyncio.gather(*(asyncio.to_thread(self._which, tool) for tool in tools))
+        installed = {tool for tool, present in zip(tools, found) if present}
+        missing_tools = sorted(required - installed)
+        self._tools_status = {tool: tool in installed for tool in tools}
 
         if missing_tools:
             logger.warning(f"Missing tools: {missing_tools}")
-            if await self._install_missing_tools(missing_tools):
-                self.fixes_applied.extend(f"Installed {tool}" for tool in missing_tools)
+            success = await self._install_missing_tools(missing_tools)
+            # Installs change PATH lookups; probe these tools again
+            for tool in missing_tools:
+                self._probe_cache.pop(f"which:{tool}", None)
+            if success:
+                self.fixes_applied.update(f"Installed {tool}" for tool in missing_tools)
+                self._tools_status.update(dict.fromkeys(missing_tools, True))
                 return True
+            self._tools_status = None
             return False
 
         return True
@@ -140,21 +273,11 @@ class DeploymentVerifier:
             otherwise.
         """
         try:
-            # Check GCP permissions
-            if not await self._verify_gcp_permissions():
-                if await self._fix_gcp_permissions():
-                    self.fixes_applied.append("Fixed GCP permissions")
-                else:
-                    return False
-
-            # Check Kubernetes permissions
-            if not await self._verify_k8s_permissions():
-                if await self._fix_k8s_permissions():
-                    self.fixes_applied.append("Fixed Kubernetes permissions")
-                else:
-                    return False
-
-            return True
+            # GCP and Kubernetes permissions are independent
+            return await self._verify_and_fix([
+                (self._verify_gcp_permissions, self._fix_gcp_permissions, "Fixed GCP permissions"),
+                (self._verify_k8s_permissions, self._fix_k8s_permissions, "Fixed Kubernetes permissions"),
+            ])
 
         except Exception as e:
             logger.error(f"Permission verification failed: {str(e)}")
@@ -172,26 +295,50 @@ class DeploymentVerifier:
             otherwise.
         """
         try:
-            # Check database connectivity
-            if not await self._verify_db_connection():
-                if await self._fix_db_connection():
-                    self.fixes_applied.append("Fixed database connectivity")
-                else:
-                    return False
-
-            # Check storage connectivity
-            if not await self._verify_storage_connection():
-                if await self._fix_storage_connection():
-                    self.fixes_applied.append("Fixed storage connectivity")
-                else:
-                    return False
-
-            return True
+            # Database and storage connectivity are independent
+            return await self._verify_and_fix([
+                (self._verify_db_connection, self._fix_db_connection, "Fixed database connectivity"),
+                (self._verify_storage_connection, self._fix_storage_connection, "Fixed storage connectivity"),
+            ])
 
         except Exception as e:
             logger.error(f"Connectivity verification failed: {str(e)}")
             return False
 
+    async def _verify_and_fix(
+        self, checks: List[Tuple[Callable[[], Any], Callable[[], Any], str]]
+    ) -> bool:
+        """
+        Runs independent probes concurrently, then the fixes for the failed ones concurrently.
+
+        Args:
+            checks: (probe, fix, fix description) triples; probe and fix are coroutine functions.
+
+        Returns:
+            bool: True if every probe passed or its fix succeeded.
+
+        Raises:
+            Exception: The first error raised by a probe or fix, once all of them have finished.
+        """
+        # return_exceptions keeps sibling probes from running on unobserved after one raises
+        passed = self._raise_first(
+            await asyncio.gather(*(probe() for probe, _, _ in checks), return_exceptions=True)
+        )
+        to_fix = [(fix, label) for (_, fix, label), ok in zip(checks, passed) if not ok]
+        fixed = await asyncio.gather(*(fix() for fix, _ in to_fix), return_exceptions=True)
+        self.fixes_applied.update(
+            label for (_, label), ok in zip(to_fix, fixed) if ok is True
+        )
+        return all(self._raise_first(fixed))
+
+    @staticmethod
+    def _raise_first(results: List[Any]) -> List[Any]:
+        """Returns gather results unchanged, or raises the first exception among them."""
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
     async def _request_more_cpu(self) -> bool:
         """
         Request CPU allocation increase.
@@ -258,27 +405,40 @@ class DeploymentVerifier:
         """
         Install missing tools.
         
-        Attempts to install specified missing tools on the system.
-        Currently supports installation of kubectl, docker, gcloud, and psql.
+        Attempts to install specified missing tools on the system, all at once since the
+        installs are independent. Currently supports installation of kubectl, docker, gcloud,
+        and psql. If some installs fail, the ones that succeeded are still recorded in
+        fixes_applied.
         
         Args:
             tools (List[str]): A list of tool names to be installed.
         Returns:
             bool: True if successful, False otherwise."""
-        try:
-            for tool in tools:
-                if tool == "kubectl":
-                    await self._install_kubectl()
-                elif tool == "docker":
-                    await self._install_docker()
-                elif tool == "gcloud":
-                    await self._install_gcloud()
-                elif tool == "psql":
-                    await self._install_psql()
+        installers = {
+            "kubectl": self._install_kubectl,
+            "docker": self._install_docker,
+            "gcloud": self._install_gcloud,
+            "psql": self._install_psql,
+        }
+        to_install = [tool for tool in tools if tool in installers]
+        results = await asyncio.gather(
+            *(installers[tool]() for tool in to_install), return_exceptions=True
+        )
+
+        failed = [
+            (tool, result) for tool, result in zip(to_install, results)
+            if isinstance(result, Exception)
+        ]
+        if not failed:
             return True
-        except Exception as e:
-            logger.error(f"Tool installation failed: {str(e)}")
-            return False
+
+        for tool, error in failed:
+            logger.error(f"Tool installation failed: {tool}: {str(error)}")
+        failed_tools = {tool for tool, _ in failed}
+        self.fixes_applied.update(
+            f"Installed {tool}" for tool in to_install if tool not in failed_tools
+        )
+        return False
 
     async def generate_report(self) -> Dict:
         """
@@ -293,30 +453,89 @@ class DeploymentVerifier:
         success, fixes = await self.verify_all()
         return {
             "success": success,
-            "fixes_applied": fixes,
+            "fixes_applied": sorted(fixes),
             "system_status": {
-                "cpu_cores": psutil.cpu_count(),
-                "memory_gb": psutil.virtual_memory().total / (1024**3),
-                "storage_gb": shutil.disk_usage("/").total / (1024**3)
+                "cpu_cores": self._cpu_cores(),
+                "memory_gb": self._memory_gb(),
+                "storage_gb": self._storage_gb()
             },
-            "tools_status": {
-                tool: bool(shutil.which(tool))
+            "tools_status": self._tools_status if self._tools_status is not None else {
+                tool: self._which(tool)
                 for tool in self.requirements.required_tools
             },
             "timestamp": datetime.utcnow().isoformat()
         }
 
     async def _verify_gcp_permissions(self) -> bool:
-        """Verify GCP permissions"""
-        return True
+        """
+        Verify GCP permissions.
+
+        All of REQUIRED_GCP_PERMISSIONS are tested with a single testIamPermissions request
+        rather than one call per permission.
+        """
+        project_id = os.getenv("GCP_PROJECT_ID")
+        if not project_id:
+            logger.warning("GCP_PROJECT_ID is not set; skipping GCP permission check")
+            return True
+
+        from google.cloud import resourcemanager_v3
+
+        response = await resourcemanager_v3.ProjectsAsyncClient().test_iam_permissions(
+            request={
+                "resource": f"projects/{project_id}",
+                "permissions": list(REQUIRED_GCP_PERMISSIONS),
+            }
+        )
+        missing = set(REQUIRED_GCP_PERMISSIONS) - set(response.permissions)
+        if missing:
+            logger.error(f"Missing GCP permissions: {sorted(missing)}")
+        return not missing
 
     async def _fix_gcp_permissions(self) -> bool:
         """Fix GCP permissions"""
         return True
 
     async def _verify_k8s_permissions(self) -> bool:
-        """Verify Kubernetes permissions"""
-        return True
+        """
+        Verify Kubernetes permissions.
+
+        Issues one SelfSubjectAccessReview per entry of REQUIRED_K8S_ACCESS, concurrently but
+        with at most K8S_REVIEW_CONCURRENCY in flight.
+        """
+        from kubernetes_asyncio import client, config
+
+        try:
+            config.load_incluster_config()
+        except config.ConfigException:
+            await config.load_kube_config()
+
+        namespace = os.getenv("K8S_NAMESPACE", "default")
+        semaphore = asyncio.Semaphore(K8S_REVIEW_CONCURRENCY)
+
+        async with client.ApiClient() as api_client:
+            authorization = client.AuthorizationV1Api(api_client)
+
+            async def review(verb: str, group: str, resource: str) -> bool:
+                body = client.V1SelfSubjectAccessReview(
+                    spec=client.V1SelfSubjectAccessReviewSpec(
+                        resource_attributes=client.V1ResourceAttributes(
+                            namespace=namespace, verb=verb, group=group, resource=resource
+                        )
+                    )
+                )
+                async with semaphore:
+                    result = await authorization.create_self_subject_access_review(body)
+                return result.status.allowed
+
+            allowed = await asyncio.gather(*(review(*access) for access in REQUIRED_K8S_ACCESS))
+
+        denied = [
+            f"{verb} {resource}"
+            for (verb, _, resource), ok in zip(REQUIRED_K8S_ACCESS, allowed) if not ok
+        ]
+        if denied:
+            logger.error(f"Missing Kubernetes permissions in {namespace}: {denied}")
+        return not denied
 
     async def _fix_k8s_permissions(self) -> bool:
         """Fix Kubernetes permissions"""
@@ -1,7 +1,7 @@
 """Main application entry point."""
 
 from fastapi import FastAPI, Request, Form, HTTPException, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -14,40 +14,49 @@ from src.middleware.metrics import MetricsMiddleware
 from src.middleware.rate_limiter import RateLimiterMiddleware
 from src.middleware.validation import InputValidationMiddleware
 from src.middleware.security import SecurityHeadersMiddleware
-from src.database.database import Base, engine
+from src.database.database import Base, init_schema
 import logging
-from src.utils.email import send_contact_email
+from functools import lru_cache
+from src.utils.email import close_smtp_client, send_contact_email
 from src.utils.validation import validate_contact
 
 logger = logging.getLogger(__name__)
 
 
+# The application's middleware stack, outermost first; built once at import
+MIDDLEWARE = (
+    Middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["*"],
+    ),
+    Middleware(ErrorHandlerMiddleware),
+    Middleware(MetricsMiddleware),
+    Middleware(LoggingMiddleware),
+    Middleware(RateLimiterMiddleware, max_requests=100, time_window=60),
+    Middleware(InputValidationMiddleware),
+    Middleware(SecurityHeadersMiddleware),
+)
+
+
+@lru_cache(maxsize=1)
 def get_application() -> FastAPI:
     """
     Creates and configures the FastAPI application.
 
+    The application is built once per process; tests that need a fresh instance can call
+    get_application.cache_clear().
+
     Returns: A configured FastAPI application instance.
     """
-    middleware = [
-        Middleware(
-            CORSMiddleware,
-            allow_origins=[str(origin) for origin in settings.ALLOWED_HOSTS],
-            allow_credentials=True,
-            allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            allow_headers=["*"],
-        ),
-        Middleware(ErrorHandlerMiddleware),
-        Middleware(MetricsMiddleware),
-        Middleware(LoggingMiddleware),
-        Middleware(RateLimiterMiddleware, max_requests=100, time_window=60),
-        Middleware(InputValidationMiddleware),
-        Middleware(SecurityHeadersMiddleware),
-    ]
-
     application = FastAPI(
         title=settings.PROJECT_NAME,
         debug=settings.DEBUG,
-        middleware=middleware,
+        middleware=list(MIDDLEWARE),
+        # Endpoints returning plain data are serialized with orjson
+        default_response_class=ORJSONResponse,
     )
 
     application.include_router(api_router, prefix=settings.API_PREFIX)
@@ -58,7 +67,17 @@ app = get_application()
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-Base.metadata.create_all(bind=engine)
+
+@app.on_event("startup")
+async def _init_schema():
+    """Creates missing tables once the worker is up rather than at import time."""
+    await init_schema(Base.metadata)
+
+
+@app.on_event("shutdown")
+async def _close_smtp():
+    """Closes the shared SMTP connection used by the contact endpoint."""
+    await close_smtp_client()
 
 
 @app.get("/health", tags=["Health Check"])
@@ -5,10 +5,32 @@ from sqlalchemy.orm import Session
 from src.database.database import get_db
 from src.database import models
 from datetime import timedelta
+import hashlib
+import time
+from cachetools import TLRUCache
 
 
 security = HTTPBearer()
 
+# Seconds a resolved token -> user mapping is reused (never past the token's own expiry)
+TOKEN_CACHE_TTL = 30
+# Seconds an invalid token is remembered, to absorb floods of the same bad token
+INVALID_TOKEN_TTL = 2
+
+# Token digest -> (expires_at, user primary key or None for an invalid token)
+_token_cache = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda _key, value, _now: value[0],
+    timer=time.time,
+)
+
+
+def _cache_until(payload: dict) -> float:
+    """Absolute time until which a token's user may be cached, clamped to the token's exp."""
+    until = time.time() + TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    return min(until, exp) if exp is not None else until
+
 
 def get_current_user(token: str = Security(security), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
@@ -16,16 +38,34 @@ def get_current_user(token: str = Security(security), db: Session = Depends(get_
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    raw_token = getattr(token, "credentials", token)
+    key = hashlib.blake2b(raw_token.encode(), digest_size=16).digest()
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        email = cached[1]
+        if email is None:
+            raise credentials_exception
+        # Only the key is shared; each request loads its own instance in its own session
+        user = db.get(models.User, email)
+        if user is None:
+            _token_cache.pop(key, None)
+            raise credentials_exception
+        return user
+
     try:
-        payload = verify_token(token)
+        payload = verify_token(raw_token)
         email: str = payload.get("email")
         if email is None:
             raise credentials_exception
     except:
+        _token_cache[key] = (time.time() + INVALID_TOKEN_TTL, None)
         raise credentials_exception
     user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
+        _token_cache[key] = (time.time() + INVALID_TOKEN_TTL, None)
         raise credentials_exception
+    _token_cache[key] = (_cache_until(payload), user.email)
     return user
     
 
@@ -1,7 +1,15 @@
 from fastapi import Request, HTTPException, status, Response
 from fastapi.responses import HTMLResponse
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+import logging
 
+logger = logging.getLogger(__name__)
+
+# The 500 page never changes, so it is encoded once rather than on every failure
+_ERROR_HTML = (
+    b"<html><body><h1>500 Internal Server Error</h1>"
+    b"<p>An unexpected error occurred.</p></body></html>"
+)
 
 
 class ErrorHandlerMiddleware(BaseHTTPMiddleware):
@@ -21,12 +29,11 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             Response: The response from the next endpoint.
         """
         try:
-          response = await call_next(request)
-          return response
-        except Exception as exc:
-            # Generic error handling for all exceptions
-            print(f"Unhandled exception: {exc}")  # Log the exception
+            return await call_next(request)
+        except Exception:
+            # Generic error handling for all exceptions; the details go to the log only
+            logger.exception("Unhandled exception")
             # Return a user-friendly error page
-            error_html = "<html><body><h1>500 Internal Server Error</h1><p>An unexpected error occurred.</p></body></html>"
-            return HTMLResponse(content=error_html, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+            return HTMLResponse(
+                content=_ERROR_HTML, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
@@ -1,12 +1,35 @@
 from fastapi import Request, Response
 from starlette.types import ASGIApp, Receive, Scope, Send, RequestResponseEndpoint
+import itertools
 import logging
+import os
 import time
-from typing import Any
-import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Request ids are "<worker>-<sequence>": unique per process without touching the OS RNG
+_REQ_COUNTER = itertools.count()
+_WORKER_ID = os.getpid() & 0xFFFF
+
+# Fields describing the request being handled, bound once at entry and shared by its records
+_request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_context", default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds the bound request context to a record's structured extra fields."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context is not None:
+            extra = getattr(record, 'extra', None)
+            record.extra = {**context, **extra} if extra else context
+        return True
+
+
+logger.addFilter(RequestContextFilter())
+
 
 async def logging_middleware(request: Request, call_next: RequestResponseEndpoint) -> Any:
     """Middleware to log all incoming requests and their corresponding responses.
@@ -23,50 +46,36 @@ async def logging_middleware(request: Request, call_next: RequestResponseEndpoin
     Example:
         
     """
-    request_id = str(uuid.uuid4())
-    start_time = time.time()
-
-    # Log incoming request information
-    logger.info(
-        "Incoming request",
-        extra={
-            'extra': {
-                'request_id': request_id,
-                'method': request.method,
-                'url': str(request.url),
-                'client_ip': request.client.host,
-                'headers': dict(request.headers),
-            }
-        }
-    )
+    # Keep an id supplied by an upstream proxy so logs correlate across services
+    request_id = request.headers.get("x-request-id") or f"{_WORKER_ID:04x}-{next(_REQ_COUNTER):x}"
+    start_time = time.monotonic_ns()
+    token = _request_context.set({
+        'request_id': request_id,
+        'method': request.method,
+        'url': str(request.url),
+        'client_ip': request.client.host,
+    })
 
     try:
-        response = await call_next(request)
-        duration = time.time() - start_time
-        
+        # Log incoming request information. The headers are the immutable Headers mapping
+        # itself; the formatter copies it only if the record is actually emitted.
+        logger.info("Incoming request", extra={'extra': {'headers': request.headers}})
+
+        try:
+            response = await call_next(request)
+        except Exception as e:
+            logger.error(
+                "Request failed",
+                extra={'extra': {'error': str(e), 'duration': (time.monotonic_ns() - start_time) / 1e9}},
+                exc_info=True
+            )
+            raise
+
         # Log response
         logger.info(
             "Request completed",
-            extra={
-                'extra': {
-                    'request_id': request_id,
-                    'status_code': response.status_code,
-                    'duration': duration,
-                }
-            }
+            extra={'extra': {'status_code': response.status_code, 'duration': (time.monotonic_ns() - start_time) / 1e9}}
         )
         return response
-
-    except Exception as e:
-        logger.error(
-            "Request failed",
-            extra={
-                'extra': {
-                    'request_id': request_id,
-                    'error': str(e),
-                    'duration': time.time() - start_time,
-                }
-            },
-            exc_info=True
-        )
-        raise
+    finally:
+        _request_context.reset(token)
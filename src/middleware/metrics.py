@@ -5,7 +5,49 @@ This module contains the metrics middleware for collecting and recording metrics
 from fastapi import Request
 import time
 from starlette.middleware import Middleware
-from starlette.types import RequestResponseEndpoint
+from starlette.middleware.base import RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.monitoring.metrics import MetricsManager
+
+
+class MetricsMiddleware:
+    """
+    Collects and records metrics about incoming HTTP requests, as plain ASGI middleware.
+
+    Records the same figures as metrics_middleware, but takes the status code from the
+    http.response.start message instead of going through BaseHTTPMiddleware, so no extra task
+    or response streams are created per request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.metrics = MetricsManager()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.monotonic_ns()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Measure the duration of the request
+            duration = (time.monotonic_ns() - start_time) / 1e9
+            self.metrics.record_request(
+                method=scope["method"],
+                endpoint=scope["path"],
+                status=status_code,
+                duration=duration
+            )
 
 
 async def metrics_middleware(request: Request, call_next: RequestResponseEndpoint) :
@@ -27,13 +69,13 @@ async def metrics_middleware(request: Request, call_next: RequestResponseEndpoin
     Returns:
         Any: The HTTP response after processing.
     """
-    start_time = time.time()
+    start_time = time.monotonic_ns()
 
     # Call the next middleware or endpoint
     response = await call_next(request)
 
     # Measure the duration of the request
-    duration = time.time() - start_time
+    duration = (time.monotonic_ns() - start_time) / 1e9
     # MetricsManager.record_request(
     #     method=request.method,
     #     endpoint=request.url.path,
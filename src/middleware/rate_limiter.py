@@ -1,15 +1,76 @@
 from fastapi import Request, HTTPException, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+import logging
+import math
+import os
 import time
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # Redis-backed limiting is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# When set, RateLimiterMiddleware counts requests in Redis so the limit holds across workers
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+# Seconds between sweeps of idle RateLimiter buckets
+SWEEP_INTERVAL = 30
+
+# Token bucket state: (tokens left, monotonic time of the last refill)
+Bucket = Tuple[float, float]
+
+
+def _take_token(bucket: Optional[Bucket], now: float, capacity: int, time_window: float) -> Tuple[Bucket, float]:
+    """
+    Refills a token bucket lazily and tries to take one token from it.
+
+    The bucket holds up to capacity tokens and refills at capacity / time_window per second, so
+    sustained traffic is held to capacity requests per window while allowing a full burst.
+
+    Returns:
+        The bucket's new state and, if no token was available, the seconds until one will be
+        (0.0 when the request is admitted).
+    """
+    refill_rate = capacity / time_window
+    tokens, last = bucket if bucket is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - last) * refill_rate)
+    if tokens < 1:
+        return (tokens, now), (1 - tokens) / refill_rate
+    return (tokens - 1, now), 0.0
+
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests",
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+def _too_many_requests_response(retry_after: float) -> JSONResponse:
+    # Middleware has to answer directly: an HTTPException raised in dispatch bypasses FastAPI's
+    # exception handlers and surfaces as a 500
+    return JSONResponse(
+        {"detail": "Too many requests"},
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
 
 
 class RateLimiterMiddleware(BaseHTTPMiddleware):
     """
-    Middleware for rate limiting incoming requests based on IP and endpoint.
+    Middleware for rate limiting incoming requests by IP, with a stricter limit for login.
+
+    Login and general API traffic each have their own per-IP token buckets, so API volume never
+    spends or refills a client's login budget.
     """
 
-    def __init__(self, app, max_requests: int = 100, time_window: int = 60, login_max_requests: int = 5, login_time_window: int = 60):
+    def __init__(self, app, max_requests: int = 100, time_window: int = 60, login_max_requests: int = 5, login_time_window: int = 60, max_clients: int = 10_000, redis_url: Optional[str] = RATE_LIMIT_REDIS_URL):
         """
         Initializes the RateLimiterMiddleware.
 
@@ -19,13 +80,24 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
             time_window: The time window (in seconds) for general API rate limiting.
             login_max_requests: The maximum number of login attempts allowed within the login time window.
             login_time_window: The time window (in seconds) for login attempts rate limiting.
+            max_clients: The maximum number of IPs tracked at once for each limit.
+            redis_url: Redis to keep shared fixed-window counts in; the in-process token buckets
+                are used when unset, and as a fallback when Redis is unreachable.
         """
         super().__init__(app)
         self.max_requests = max_requests
         self.time_window = time_window
         self.login_max_requests = login_max_requests
         self.login_time_window = login_time_window
-        self.request_counts: Dict[str, Dict[str, List[int]]] = {}
+        # Bounded LRU tables keyed by IP alone, one per limit, so per-resource paths don't
+        # multiply entries and each client's budget is its own
+        self._login_limiter = RateLimiter(login_max_requests, login_time_window, max_clients)
+        self._api_limiter = RateLimiter(max_requests, time_window, max_clients)
+        self._redis = None
+        if redis_url:
+            if aioredis is None:
+                raise RuntimeError("redis_url is set but the redis package is not installed")
+            self._redis = aioredis.from_url(redis_url)
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
         """
@@ -38,9 +110,6 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
         client_ip = request.client.host
         endpoint = request.url.path
 
-        if client_ip not in self.request_counts:
-            self.request_counts[client_ip] = {}
-
         # Separate rate limiting for login attempts
         if endpoint == "/api/auth/login":
             response = await self.handle_login_rate_limiting(request, call_next, client_ip, endpoint)
@@ -51,27 +120,113 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
 
     async def handle_login_rate_limiting(self, request: Request, call_next: RequestResponseEndpoint, client_ip: str, endpoint: str):
         """Handles rate limiting specifically for login attempts."""
-        return await self.handle_rate_limiting(request, call_next, client_ip, endpoint, self.login_max_requests, self.login_time_window)
+        return await self.handle_rate_limiting(request, call_next, client_ip, "login", self._login_limiter)
     
     async def handle_api_rate_limiting(self, request: Request, call_next: RequestResponseEndpoint, client_ip: str, endpoint: str):
         """Handles rate limiting for general API requests."""
-        return await self.handle_rate_limiting(request, call_next, client_ip, endpoint, self.max_requests, self.time_window)
+        return await self.handle_rate_limiting(request, call_next, client_ip, "api", self._api_limiter)
 
 
-    async def handle_rate_limiting(self, request: Request, call_next: RequestResponseEndpoint, client_ip: str, endpoint: str, max_requests:int, time_window: int):
+    async def handle_rate_limiting(self, request: Request, call_next: RequestResponseEndpoint, client_ip: str, scope: str, limiter: "RateLimiter"):
         """
         Handles rate limiting logic for different types of requests.
         """
-        if endpoint not in self.request_counts[client_ip]:
-            self.request_counts[client_ip][endpoint] = []
-        current_time = int(time.time())
-        # Remove old requests outside the time window
-        self.request_counts[client_ip][endpoint] = [
-            request_time for request_time in self.request_counts[client_ip][endpoint] if current_time - request_time < time_window
-        ]
-
-        if len(self.request_counts[client_ip][endpoint]) >= max_requests:
-            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests")
-        self.request_counts[client_ip][endpoint].append(current_time)
+        if self._redis is not None:
+            retry_after = await self._count_in_redis(client_ip, scope, limiter)
+        else:
+            retry_after = limiter.take(client_ip)
+        if retry_after:
+            return _too_many_requests_response(retry_after)
         response = await call_next(request)
         return response
+
+    async def _count_in_redis(self, client_ip: str, scope: str, limiter: "RateLimiter") -> float:
+        """
+        Counts the request against a fixed window shared through Redis.
+
+        INCR and EXPIRE go out in one pipelined round trip. Falls back to the in-process bucket
+        if Redis fails, so an outage degrades to per-worker limits rather than rejecting traffic.
+
+        Returns:
+            float: Seconds until the window resets if the limit is exceeded, otherwise 0.0.
+        """
+        max_requests, time_window = limiter.max_requests, limiter.time_window
+        now = time.time()
+        window = int(now // time_window)
+        key = f"rl:{scope}:{client_ip}:{window}"
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, time_window)
+                count, _ = await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Redis rate limiting unavailable, using local limits: {e}")
+            return limiter.take(client_ip)
+        if count > max_requests:
+            return (window + 1) * time_window - now
+        return 0.0
+
+
+class RateLimiter:
+    """
+    Per-client-IP rate limiting as a FastAPI dependency, for sensitive auth endpoints.
+
+    Each IP has a token bucket of max_requests tokens refilled over time_window, stored as two
+    floats and refilled lazily on each request. IPs are held in LRU order and the least recently
+    seen is evicted beyond max_clients, which bounds memory however many addresses a client rotates.
+    Every SWEEP_INTERVAL seconds, buckets idle for a full window are dropped as well: they have
+    refilled completely, so forgetting them changes no decision.
+    """
+
+    def __init__(self, max_requests: int = 5, time_window: int = 60, max_clients: int = 10_000):
+        """
+        Initializes the RateLimiter.
+
+        Args:
+            max_requests: The maximum number of requests allowed per IP within the time window.
+            time_window: The time window (in seconds).
+            max_clients: The maximum number of IPs tracked at once.
+        """
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.max_clients = max_clients
+        self.buckets: "OrderedDict[str, Bucket]" = OrderedDict()
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL
+
+    async def __call__(self, request: Request):
+        """Raises 429 when the requesting IP has exhausted its allowance for the window."""
+        retry_after = self.take(request.client.host)
+        if retry_after:
+            raise _too_many_requests(retry_after)
+
+    def take(self, client_ip: str) -> float:
+        """Takes a token from client_ip's bucket; returns seconds to wait, or 0.0 if admitted."""
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        # Coroutines on one event loop can't interleave between this read and write, so the
+        # bucket update needs no lock
+        bucket = self.buckets.get(client_ip)
+        bucket, retry_after = _take_token(bucket, now, self.max_requests, self.time_window)
+
+        self.buckets[client_ip] = bucket
+        self.buckets.move_to_end(client_ip)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+    def _sweep(self, now: float):
+        """Drops buckets not used for a full window."""
+        # Buckets are in order of last use, which is also their last refill, so the idle ones
+        # are all at the front
+        idle_before = now - self.time_window
+        while self.buckets:
+            _, last = next(iter(self.buckets.values()))
+            if last > idle_before:
+                break
+            self.buckets.popitem(last=False)
+        self._next_sweep = now + SWEEP_INTERVAL
+
+
+rate_limiter_middleware = RateLimiter()
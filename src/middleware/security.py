@@ -1,45 +1,99 @@
-from fastapi import Request, Response, HTTPException, status
-from typing import Dict, Set
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from fastapi import status
+from fastapi.responses import JSONResponse
+from typing import Dict, Optional, Set
+import ipaddress
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Security headers added to every response, encoded once as raw (name, value) pairs
+_SECURITY_HEADERS = tuple(
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in (
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "DENY"),
+        ("Content-Security-Policy", "default-src 'self'; object-src 'none'"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        ("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload"),
+    )
+)
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in _SECURITY_HEADERS)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+# Set on IPv6 keys so they can never equal an IPv4 key
+_IPV6_TAG = 1 << 128
+
+
+def ip_key(ip: str) -> Optional[int]:
+    """
+    Packs an IP address into an int, so every spelling of an address maps to one key.
+
+    IPv4-mapped IPv6 addresses map to their IPv4 key. Returns None if ip is not an address.
+    """
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    if address.version == 6:
+        if address.ipv4_mapped is not None:
+            return int(address.ipv4_mapped)
+        return int(address) | _IPV6_TAG
+    return int(address)
+
+
+class SecurityHeadersMiddleware:
     """
     Middleware to set security headers in HTTP responses.
+
+    Written as plain ASGI: the headers are spliced into the http.response.start message, which
+    avoids BaseHTTPMiddleware's extra task and response wrapping on every request.
     """
 
-    blacklisted_ips: Set[str] = set()
-    failed_attempts: Dict[str, int] = {}
+    # Both keyed by ip_key
+    blacklisted_ips: Set[int] = set()
+    failed_attempts: Dict[int, int] = {}
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @classmethod
+    def block_ip(cls, ip: str):
+        """Adds ip to the blacklist."""
+        key = ip_key(ip)
+        if key is not None:
+            cls.blacklisted_ips.add(key)
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+    @classmethod
+    def is_ip_blocked(cls, ip: str) -> bool:
+        """Returns whether ip is blacklisted."""
+        return ip_key(ip) in cls.blacklisted_ips
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Sets security headers in the response and blocks blacklisted IP addresses.
         """
-        client_ip = request.client.host
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                # Add security headers to response, replacing any the endpoint set itself
+                headers = list(message.get("headers", ()))
+                if any(name in _SECURITY_HEADER_NAMES for name, _ in headers):
+                    headers = [h for h in headers if h[0] not in _SECURITY_HEADER_NAMES]
+                headers.extend(_SECURITY_HEADERS)
+                message["headers"] = headers
+            await send(message)
+
+        client = scope.get("client")
+        client_key = ip_key(client[0]) if client else None
 
-        # Check if the IP is blacklisted
-        if client_ip in self.blacklisted_ips:
-            raise HTTPException(
+        # Check if the IP is blacklisted, or has now made too many failed attempts
+        if client_key in self.blacklisted_ips or self.failed_attempts.get(client_key, 0) > 5:
+            self.blacklisted_ips.add(client_key)
+            response = JSONResponse(
+                {"detail": "Your IP address has been blocked due to suspicious activity."},
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Your IP address has been blocked due to suspicious activity.",
             )
+            await response(scope, receive, send_with_headers)
+            return
 
-        # Check the number of attempts from this ip
-        if client_ip in self.failed_attempts:
-            if self.failed_attempts[client_ip] > 5:
-                self.blacklisted_ips.add(client_ip)
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Your IP address has been blocked due to suspicious activity.",
-                )
-
-        response: Response = await call_next(request)
-        
-        # Add security headers to response
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Content-Security-Policy"] = "default-src 'self'; object-src 'none'"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
-        
-        return response
+        await self.app(scope, receive, send_with_headers)
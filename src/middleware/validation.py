@@ -3,9 +3,37 @@
 from fastapi import Request, HTTPException, status, Depends
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from pydantic import BaseModel, ValidationError
+from typing import Dict, Type
+import orjson
 from src.auth import get_current_user
 
 
+class UserRegisterValidation(BaseModel):
+    """Body of a user register request."""
+    email: str
+    password: str
+
+
+class UserLoginValidation(BaseModel):
+    """Body of a user login request."""
+    email: str
+    password: str
+
+
+class UserResetValidation(BaseModel):
+    """Body of a password reset request."""
+    email: str
+
+
+# Body model per path, built once at import. Bodies of other paths are left for the endpoint
+# to parse.
+_BODY_MODELS: Dict[str, Type[BaseModel]] = {
+    "/api/auth/register": UserRegisterValidation,
+    "/api/auth/login": UserLoginValidation,
+    "/api/auth/password-reset": UserResetValidation,
+}
+
+
 class InputValidationMiddleware(BaseHTTPMiddleware):
     """Middleware for input validation."""
 
@@ -24,27 +52,13 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
             if request.method in ["POST", "PUT"]:
                 content_type = request.headers.get("Content-Type")
                 if content_type == "application/json":
-                    body = await request.json()
-                    if request.url.path == "/api/auth/register":
-                        # Validate the body for user register
-                        class UserRegisterValidation(BaseModel):
-                            email: str
-                            password: str
-                        UserRegisterValidation.model_validate(body)
-                    elif request.url.path == "/api/auth/login":
-                        # Validate the body for user login
-                        class UserLoginValidation(BaseModel):
-                            email: str
-                            password: str
-                        UserLoginValidation.model_validate(body)
-                    elif request.url.path == "/api/auth/password-reset":
-                        # Validate the body for password reset request
-                        class UserResetValidation(BaseModel):
-                            email: str
-                        UserResetValidation.model_validate(body)
-                    else:
-                        pass
-                        #TODO: Add more input validation
+                    # Only parse bodies there is a validator for; parsing the rest here would
+                    # build Python objects just to discard them
+                    model = _BODY_MODELS.get(request.url.path)
+                    if model is not None:
+                        # orjson parses the raw body several times faster than request.json()'s
+                        # stdlib decoder; body() keeps the bytes cached on the request
+                        model.parse_obj(orjson.loads(await request.body()))
                 else:
                     # Raise an exception if the content type is not json
                     raise HTTPException(
@@ -112,6 +112,7 @@ class MetricsManager:
         pass
 
     def update_gpu_memory(self, device: str, bytes_used: int) -> None:
+        """
         Updates the GPU memory usage metric.
 
         Args:
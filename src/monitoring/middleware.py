@@ -15,7 +15,7 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
         self.secure_logger = SecureLogger()
 
     async def dispatch(self, request: Request, call_next: Callable):
-        start_time = time.time()
+        start_time = time.monotonic_ns()
 
         try:
             # Get request details
@@ -27,7 +27,7 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
 
             # Calculate duration
-            duration = time.time() - start_time
+            duration = (time.monotonic_ns() - start_time) / 1e9
 
             # Record metrics
             await self.metrics.record_request(
@@ -49,7 +49,7 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
 
         except Exception as e:
             # Record error metrics
-            duration = time.time() - start_time
+            duration = (time.monotonic_ns() - start_time) / 1e9
             await self.metrics.record_request(
                 model_name=request.path_params.get('model_name', 'unknown'),
                 status='error',
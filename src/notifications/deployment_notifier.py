@@ -1,7 +1,8 @@
+import asyncio
 import logging
 import aiohttp
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 import os
 
@@ -37,6 +38,31 @@ class DeploymentNotifier:
         except Exception as e:
             logger.error(f"Failed to send deployment notifications: {str(e)}")
 
+    async def notify_batch(self, statuses: List[Dict[str, Any]]):
+        """Send several deployment status updates as one notification per channel"""
+        try:
+            if not statuses:
+                return
+            if len(statuses) == 1:
+                await self.notify_deployment_status(statuses[0])
+                return
+            if any('stage' not in status or 'status' not in status for status in statuses):
+                raise ValueError("Missing required keys in status dictionary")
+
+            messages = [self._format_message(status) for status in statuses]
+            message = {
+                'summary': "\n".join(m['summary'] for m in messages),
+                'details': "".join(m['details'] for m in messages)
+            }
+            await asyncio.gather(
+                self._send_slack_notification(message),
+                self._send_teams_notification(message),
+                self._send_email_notification(message)
+            )
+            logger.info(f"Deployment notifications sent successfully: {len(statuses)} stages")
+        except Exception as e:
+            logger.error(f"Failed to send deployment notifications: {str(e)}")
+
     async def _send_slack_notification(self, message: Dict):
         """Send notification to Slack"""
         if not self.slack_webhook:
@@ -6,6 +6,23 @@ from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
+
+def _combine_patterns(patterns: List[str]) -> "re.Pattern[str]":
+    """
+    Compiles patterns into one alternation so input is scanned once rather than once per pattern.
+
+    Each pattern becomes a named group p<index>, so match.lastgroup identifies which one hit. A
+    leading (?i) is scoped to its own pattern, since global flags are only allowed at the start
+    of the combined expression.
+    """
+    alternatives = []
+    for index, pattern in enumerate(patterns):
+        if pattern.startswith('(?i)'):
+            pattern = f'(?i:{pattern[4:]})'
+        alternatives.append(f'(?P<p{index}>{pattern})')
+    return re.compile('|'.join(alternatives))
+
+
 class InputValidation(BaseModel):
     max_length: int = 32768  # Maximum input length
     allowed_patterns: Dict[str, str] = {
@@ -30,6 +47,13 @@ class IOSecurityValidator:
     def __init__(self):
         self.input_validation = InputValidation()
         self.output_validation = OutputValidation()
+        # Patterns are compiled once here instead of being looked up in re's cache per call
+        self._allowed = {
+            input_type: re.compile(pattern)
+            for input_type, pattern in self.input_validation.allowed_patterns.items()
+        }
+        self._blocked = _combine_patterns(self.input_validation.blocked_patterns)
+        self._sensitive = _combine_patterns(self.output_validation.sensitive_patterns)
 
     async def validate_input(self, data: str, input_type: str = 'text') -> str:
         """Validate and sanitize input"""
@@ -39,15 +63,16 @@ class IOSecurityValidator:
                 raise HTTPException(status_code=400, detail="Input exceeds maximum length")
 
             # Check against allowed patterns
-            pattern = self.input_validation.allowed_patterns.get(input_type)
-            if pattern and not re.match(pattern, data):
+            pattern = self._allowed.get(input_type)
+            if pattern and not pattern.match(data):
                 raise HTTPException(status_code=400, detail="Invalid input format")
 
-            # Check for blocked patterns
-            for pattern in self.input_validation.blocked_patterns:
-                if re.search(pattern, data):
-                    logger.warning(f"Blocked pattern detected in input: {pattern}")
-                    raise HTTPException(status_code=400, detail="Invalid input detected")
+            # Check for blocked patterns, all in one scan
+            match = self._blocked.search(data)
+            if match:
+                pattern = self.input_validation.blocked_patterns[int(match.lastgroup[1:])]
+                logger.warning(f"Blocked pattern detected in input: {pattern}")
+                raise HTTPException(status_code=400, detail="Invalid input detected")
 
             return data
 
@@ -63,11 +88,10 @@ class IOSecurityValidator:
                 logger.warning("Output exceeded maximum length")
                 data = data[:self.output_validation.max_length]
 
-            # Check for sensitive data
-            for pattern in self.output_validation.sensitive_patterns:
-                if re.search(pattern, data):
-                    logger.warning("Sensitive data detected in output")
-                    data = re.sub(pattern, '[REDACTED]', data)
+            # Check for sensitive data, redacting every pattern in one pass
+            data, redactions = self._sensitive.subn('[REDACTED]', data)
+            if redactions:
+                logger.warning("Sensitive data detected in output")
 
             return data
 
@@ -0,0 +1,60 @@
+import copy
+import random
+import pytest
+from src.config.config_manager import ConfigurationManager
+
+
+def reference_merge(base, override):
+    """Straightforward deep merge on a deep copy, to check _merge_configs against"""
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = reference_merge(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def random_config(rng, depth=0):
+    config = {}
+    for _ in range(rng.randint(0, 4)):
+        key = rng.choice("abcdef")
+        if depth < 3 and rng.random() < 0.4:
+            config[key] = random_config(rng, depth + 1)
+        else:
+            config[key] = rng.choice([0, 1, "x", "y", None, [1, 2]])
+    return config
+
+
+@pytest.fixture
+def manager():
+    return ConfigurationManager()
+
+
+def test_merge_matches_deep_merge_and_leaves_base_alone(manager):
+    rng = random.Random(1234)
+    for _ in range(500):
+        base, override = random_config(rng), random_config(rng)
+        snapshot = copy.deepcopy(base)
+
+        merged = manager._merge_configs(base, override)
+
+        assert merged == reference_merge(snapshot, override)
+        assert base == snapshot
+
+
+def test_merge_shares_untouched_branches(manager):
+    base = {'db': {'pool': {'size': 5}, 'host': 'a'}, 'cache': {'ttl': 60}}
+    merged = manager._merge_configs(base, {'db': {'host': 'b'}})
+
+    assert merged == {'db': {'pool': {'size': 5}, 'host': 'b'}, 'cache': {'ttl': 60}}
+    assert base['db']['host'] == 'a'
+    assert merged is not base and merged['db'] is not base['db']
+    assert merged['cache'] is base['cache']
+    assert merged['db']['pool'] is base['db']['pool']
+
+
+def test_merge_without_changes_returns_base(manager):
+    base = {'db': {'host': 'a'}, 'debug': False}
+    assert manager._merge_configs(base, {'db': {'host': 'a'}, 'debug': False}) is base
+    assert manager._merge_configs(base, {}) is base
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+
+
+class StepRecorder:
+    """
+    Stands in for a scheduler's _execute_deployment_step, recording when each step starts and
+    ends. Steps are identified by the value under key ('name' for the orchestrator, 'action' for
+    the deployment manager).
+    """
+
+    def __init__(self, key, durations=None, failures=()):
+        self.key = key
+        self.durations = durations or {}
+        self.failures = set(failures)
+        self.events = []
+        self.cancelled = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, step):
+        name = step[self.key]
+        self.events.append(('start', name))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.durations.get(name, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        finally:
+            self.running -= 1
+        if name in self.failures:
+            raise RuntimeError(f"{name} failed")
+        self.events.append(('end', name))
+
+    def index(self, event, name):
+        return self.events.index((event, name))
+
+
+@pytest.fixture
+def step_recorder():
+    """Factory for StepRecorder instances"""
+    return StepRecorder
@@ -0,0 +1,150 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from kubernetes_asyncio.client.rest import ApiException
+from src.deployment import cluster_cache
+from src.deployment.cluster_cache import ClusterStateCache, parse_quantity
+
+
+def node(name, cpu="4", memory="8Gi", version="1", unschedulable=False):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, resource_version=version),
+        spec=SimpleNamespace(unschedulable=unschedulable),
+        status=SimpleNamespace(allocatable={"cpu": cpu, "memory": memory}),
+    )
+
+
+def pod(name, node_name, cpu="500m", memory="1Gi", version="1", phase="Running", namespace="default"):
+    container = SimpleNamespace(resources=SimpleNamespace(requests={"cpu": cpu, "memory": memory}))
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, namespace=namespace, resource_version=version),
+        spec=SimpleNamespace(node_name=node_name, containers=[container]),
+        status=SimpleNamespace(phase=phase),
+    )
+
+
+def listing(items, version):
+    return SimpleNamespace(items=items, metadata=SimpleNamespace(resource_version=version))
+
+
+@pytest.fixture
+def cache():
+    state = ClusterStateCache(MagicMock())
+    state._core_v1 = MagicMock()
+    state._core_v1.list_node = AsyncMock(return_value=listing([node("n1"), node("n2")], "10"))
+    state._core_v1.list_pod_for_all_namespaces = AsyncMock(return_value=listing([pod("p1", "n1")], "20"))
+    return state
+
+
+def test_parse_quantity():
+    assert parse_quantity("500m") == Decimal("0.5")
+    assert parse_quantity("4Gi") == 4 * 2 ** 30
+    assert parse_quantity("2") == 2
+    assert parse_quantity(None) == 0
+
+
+@pytest.mark.asyncio
+async def test_relist_replaces_state(cache):
+    cache.nodes = {"stale": node("stale")}
+    await cache._relist()
+
+    assert set(cache.nodes) == {"n1", "n2"}
+    assert set(cache.pods) == {("default", "p1")}
+    assert cache._resource_versions == {"nodes": "10", "pods": "20"}
+    assert cache.free_resources() == (Decimal("7.5"), 15 * 2 ** 30)
+
+
+@pytest.mark.asyncio
+async def test_apply_watch_events(cache):
+    await cache._relist()
+
+    await cache._apply("pods", {"type": "ADDED", "object": pod("p2", "n2", cpu="1", memory="2Gi", version="21")})
+    await cache._apply("pods", {"type": "MODIFIED", "object": pod("p1", "n1", phase="Succeeded", version="22")})
+    await cache._apply("nodes", {"type": "MODIFIED", "object": node("n1", unschedulable=True, version="11")})
+    await cache._apply("nodes", {"type": "DELETED", "object": node("gone", version="12")})
+
+    assert set(cache.pods) == {("default", "p1"), ("default", "p2")}
+    assert cache.pods[("default", "p1")].status.phase == "Succeeded"
+    assert cache._resource_versions == {"nodes": "12", "pods": "22"}
+    # Only n2 is schedulable, and p2 is the only pod still running on it
+    assert cache.free_resources() == (Decimal(3), 6 * 2 ** 30)
+
+    await cache._apply("pods", {"type": "DELETED", "object": pod("p2", "n2", version="23")})
+    assert set(cache.pods) == {("default", "p1")}
+
+
+class FakeWatch:
+    """Replays scripted watch sessions; each session is a list of events or an exception"""
+
+    def __init__(self, sessions, calls):
+        self.sessions = sessions
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def stream(self, func, **kwargs):
+        self.calls.append(kwargs["resource_version"])
+        session = self.sessions.pop(0) if self.sessions else None
+        if session is None:
+            await asyncio.Event().wait()  # Block like an idle watch until cancelled
+        if isinstance(session, Exception):
+            raise session
+        for event in session:
+            yield event
+
+
+@pytest.mark.asyncio
+async def test_watch_relists_after_expired_resource_version(cache):
+    """A 410 Gone relists, and the watch resumes from the fresh list's resource version"""
+    await cache._relist()
+    cache._core_v1.list_node.return_value = listing([node("n3")], "30")
+    sessions = [
+        [{"type": "ADDED", "object": node("n4", version="15")}],
+        ApiException(status=410, reason="Gone"),
+    ]
+    calls = []
+
+    with patch.object(cluster_cache.watch, "Watch", lambda: FakeWatch(sessions, calls)):
+        task = asyncio.create_task(cache._watch("nodes"))
+        for _ in range(100):
+            if len(calls) == 3:
+                break
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    # First from the initial list, then from the applied event, then from the relist
+    assert calls == ["10", "15", "30"]
+    assert set(cache.nodes) == {"n3"}
+
+
+@pytest.mark.asyncio
+async def test_watch_survives_failed_relist(cache):
+    """A relist that fails after a 410 is retried instead of ending the watch task"""
+    await cache._relist()
+    cache._core_v1.list_node.side_effect = [ApiException(status=503, reason="Unavailable"), listing([node("n3")], "30")]
+    sessions = [ApiException(status=410, reason="Gone"), ApiException(status=410, reason="Gone")]
+    calls = []
+
+    with patch.object(cluster_cache.watch, "Watch", lambda: FakeWatch(sessions, calls)), \
+         patch.object(cluster_cache, "WATCH_RETRY_DELAY", 0):
+        task = asyncio.create_task(cache._watch("nodes"))
+        for _ in range(100):
+            if len(calls) == 3:
+                break
+            await asyncio.sleep(0)
+        assert not task.done()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    # The failed relist leaves the old version in place; the second relist succeeds
+    assert calls == ["10", "10", "30"]
+    assert set(cache.nodes) == {"n3"}
@@ -0,0 +1,79 @@
+import pytest
+from types import MappingProxyType
+from unittest.mock import AsyncMock, patch
+from src.deployment.deployment_manager import DeploymentManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DeploymentManager()
+
+
+def step(action, *depends_on):
+    return MappingProxyType({'type': 'test', 'action': action, 'params': MappingProxyType({}), 'depends_on': depends_on})
+
+
+@pytest.mark.asyncio
+async def test_deploy_backs_up_once(manager):
+    """The plan's create_backup step is the only backup a deploy takes"""
+    with patch.object(manager, '_run_pre_deployment_checks', AsyncMock(return_value=True), create=True), \
+         patch.object(manager, '_backup_current_state', AsyncMock(), create=True) as backup, \
+         patch.object(manager, '_update_code', AsyncMock(), create=True), \
+         patch.object(manager, '_update_config', AsyncMock(), create=True), \
+         patch.object(manager, '_restart_services', AsyncMock(), create=True), \
+         patch.object(manager, '_verify_deployment', AsyncMock(return_value=True)):
+        await manager.deploy('1.0.0', 'staging')
+
+    backup.assert_awaited_once_with(full=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('steps, message', [
+    ((step('a'), step('a')), "Duplicate deployment step: a"),
+    ((step('a'), step('b', 'missing')), r"Step b depends on unknown steps: \['missing'\]"),
+    ((step('b', 'a'), step('a')), r"Step b depends on unknown steps: \['a'\]"),
+])
+async def test_execute_plan_rejects_invalid_plans(manager, steps, message):
+    """Invalid plans are rejected before any step runs"""
+    with patch.object(manager, '_execute_deployment_step', AsyncMock()) as execute:
+        with pytest.raises(ValueError, match=message):
+            await manager._execute_plan(steps)
+    execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_history_is_appended_and_reloaded(manager):
+    """Each record is appended to the log and picked up by a fresh manager"""
+    await manager._update_deployment_history('1.0.0', 'staging')
+    await manager._update_deployment_history('1.0.1', 'production')
+
+    reloaded = DeploymentManager()
+    assert [r['version'] for r in reloaded.recent_history] == ['1.0.0', '1.0.1']
+    assert list(reloaded.recent_history) == list(manager.recent_history)
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_follows_default_plan_dependencies(manager, step_recorder):
+    """Backup first, then code and config updates together, then the restart"""
+    plan = await manager._create_deployment_plan('1.0.0', 'staging')
+    recorder = step_recorder('action')
+    with patch.object(manager, '_execute_deployment_step', recorder):
+        await manager._execute_plan(plan['steps'])
+
+    assert recorder.index('end', 'create_backup') < recorder.index('start', 'update_code')
+    assert recorder.index('end', 'create_backup') < recorder.index('start', 'update_config')
+    assert recorder.index('start', 'update_config') < recorder.index('end', 'update_code')
+    assert recorder.index('start', 'restart_services') > max(
+        recorder.index('end', 'update_code'), recorder.index('end', 'update_config'))
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_cancels_remaining_steps_on_failure(manager, step_recorder):
+    recorder = step_recorder('action', durations={'slow': 10}, failures={'bad'})
+    with patch.object(manager, '_execute_deployment_step', recorder):
+        with pytest.raises(RuntimeError, match="bad failed"):
+            await manager._execute_plan((step('slow'), step('bad'), step('after', 'bad')))
+
+    assert recorder.cancelled == ['slow']
+    assert ('start', 'after') not in recorder.events
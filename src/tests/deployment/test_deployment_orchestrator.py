@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.deployment.deployment_orchestrator import DeploymentOrchestrator
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DeploymentOrchestrator()
+
+
+@pytest.mark.asyncio
+async def test_unknown_step_type_is_unsupported(orchestrator):
+    with pytest.raises(ValueError, match="Unsupported deployment step type"):
+        await orchestrator._execute_deployment_step({'type': 'ftp', 'name': 'upload'})
+
+
+@pytest.mark.asyncio
+async def test_step_type_without_handler_is_unsupported(orchestrator):
+    """Step types whose handler doesn't exist yet are rejected like unknown ones"""
+    assert 'database' not in orchestrator._handlers
+    with pytest.raises(ValueError, match="Unsupported deployment step type: database"):
+        await orchestrator._execute_deployment_step({'type': 'database', 'name': 'migrate'})
+
+
+async def plan(*steps):
+    for step in steps:
+        yield step
+
+
+def step(name, *depends_on, implicit=False):
+    if implicit:
+        return {'name': name, 'type': 'kubernetes'}
+    return {'name': name, 'type': 'kubernetes', 'depends_on': list(depends_on)}
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_follows_dependencies(orchestrator, step_recorder):
+    recorder = step_recorder('name')
+    with patch.object(orchestrator, '_execute_deployment_step', recorder):
+        await orchestrator._execute_plan(plan(
+            step('a'), step('b', 'a'), step('c', 'a'), step('d', 'b', 'c'),
+        ))
+
+    assert recorder.index('end', 'a') < recorder.index('start', 'b')
+    assert recorder.index('end', 'a') < recorder.index('start', 'c')
+    assert recorder.index('start', 'd') > max(recorder.index('end', 'b'), recorder.index('end', 'c'))
+    # b and c only depend on a, so they overlap
+    assert recorder.index('start', 'c') < recorder.index('end', 'b')
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_runs_undeclared_steps_serially(orchestrator, step_recorder):
+    recorder = step_recorder('name')
+    with patch.object(orchestrator, '_execute_deployment_step', recorder):
+        await orchestrator._execute_plan(plan(*(step(name, implicit=True) for name in 'abc')))
+
+    assert recorder.events == [(event, name) for name in 'abc' for event in ('start', 'end')]
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_bounds_concurrency(orchestrator, step_recorder):
+    orchestrator.config['step_concurrency'] = 2
+    recorder = step_recorder('name')
+    with patch.object(orchestrator, '_execute_deployment_step', recorder):
+        await orchestrator._execute_plan(plan(*(step(f"s{i}") for i in range(6))))
+
+    assert recorder.peak == 2
+    assert len(recorder.events) == 12
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_cancels_running_steps_on_failure(orchestrator, step_recorder):
+    recorder = step_recorder('name', durations={'slow': 10}, failures={'bad'})
+    with patch.object(orchestrator, '_execute_deployment_step', recorder):
+        with pytest.raises(RuntimeError, match="bad failed"):
+            await orchestrator._execute_plan(plan(step('slow'), step('bad'), step('after', 'bad')))
+
+    assert recorder.cancelled == ['slow']
+    assert ('start', 'after') not in recorder.events
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('steps, message', [
+    ((step('a'), step('b', 'missing')), r"Step b depends on unknown steps: \['missing'\]"),
+    ((step('b', 'a'), step('a')), r"Step b depends on unknown steps: \['a'\]"),
+    ((step('a'), step('a')), "Duplicate deployment step: a"),
+    ((step('a'), {'name': 'migrate', 'type': 'database'}), "Unsupported deployment step type: database"),
+])
+async def test_execute_plan_rejects_invalid_steps(orchestrator, steps, message, step_recorder):
+    """An invalid step stops the plan and cancels the steps already running"""
+    recorder = step_recorder('name', durations={'a': 10})
+    with patch.object(orchestrator, '_execute_deployment_step', recorder):
+        with pytest.raises(ValueError, match=message):
+            await orchestrator._execute_plan(plan(*steps))
+
+    assert recorder.running == 0
+    assert all(event == 'start' for event, _ in recorder.events)
+
+
+@pytest.mark.asyncio
+async def test_execute_plan_starts_steps_while_planning(orchestrator, step_recorder):
+    """The first step runs before the plan generator has produced the rest"""
+    first_started = asyncio.Event()
+    recorder = step_recorder('name')
+
+    async def execute(step):
+        first_started.set()
+        await recorder(step)
+
+    async def streaming_plan():
+        yield step('a')
+        await asyncio.wait_for(first_started.wait(), 1)
+        yield step('b', 'a')
+
+    with patch.object(orchestrator, '_execute_deployment_step', execute):
+        await orchestrator._execute_plan(streaming_plan())
+
+    assert recorder.events == [('start', 'a'), ('end', 'a'), ('start', 'b'), ('end', 'b')]
@@ -0,0 +1,60 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from src.deployment.deployment_summary import DeploymentSummary
+
+
+def test_summary_survives_a_new_event_loop():
+    """Stages recorded under a second asyncio.run get a queue and drain task on that loop"""
+    summary = DeploymentSummary()
+
+    async def run(stage):
+        await summary.record_stage(stage, 'success')
+        await summary.flush()
+        return summary.get_summary()
+
+    with patch('src.deployment.deployment_summary.notifier.notify_batch', new=AsyncMock()) as notify:
+        asyncio.run(run('build'))
+        result = asyncio.run(run('deploy'))
+
+    assert set(result['stages']) == {'build', 'deploy'}
+    assert notify.await_count == 2
+
+
+def test_unflushed_task_from_closed_loop_is_replaced():
+    """A drain task left behind on a closed loop is dropped rather than reused"""
+    summary = DeploymentSummary()
+
+    async def record_only():
+        await summary.record_stage('build', 'success')
+
+    async def record_and_flush():
+        await summary.record_stage('deploy', 'success')
+        await summary.flush()
+
+    with patch('src.deployment.deployment_summary.notifier.notify_batch', new=AsyncMock()) as notify:
+        asyncio.run(record_only())
+        asyncio.run(record_and_flush())
+
+    notify.assert_awaited_with([{
+        'stage': 'deploy', 'status': 'success', 'details': None, 'environment': summary.status['environment']
+    }])
+
+
+def test_flush_stops_drain_task_and_failures_do_not_stall():
+    """flush() cancels the drain task, and a failed send doesn't block later stages"""
+    summary = DeploymentSummary()
+
+    async def run():
+        with patch('src.deployment.deployment_summary.notifier.notify_batch',
+                   new=AsyncMock(side_effect=[RuntimeError('webhook down'), None])) as notify:
+            await summary.record_stage('build', 'failure')
+            await summary.flush()
+            assert summary._notify_task is None
+
+            await summary.record_stage('rollback', 'success')
+            task = summary._notify_task
+            await summary.flush()
+            assert task.cancelled()
+            assert notify.await_count == 2
+
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+import asyncio
+from src.deployment.verify import DeploymentVerifier, SystemRequirements
+
+
+async def contend(verifier, n=4):
+    """Runs n guarded checks that overlap, so the semaphore has to queue some of them"""
+    running = peak = 0
+
+    async def check():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    await asyncio.gather(*(verifier._guarded(check()) for _ in range(n)))
+    return peak
+
+
+def test_semaphore_is_per_event_loop():
+    """A verifier used from a second loop gets a fresh semaphore instead of one bound to the first"""
+    verifier = DeploymentVerifier()
+    assert asyncio.run(contend(verifier)) == verifier.requirements.max_concurrent_verify
+    assert asyncio.run(contend(verifier)) == verifier.requirements.max_concurrent_verify
+
+
+def test_default_limit_runs_all_checks_of_one_verify_all_together():
+    """The default bound doesn't serialize the four checks of a single verify_all"""
+    assert asyncio.run(contend(DeploymentVerifier(), n=4)) == 4
+
+
+def test_semaphore_keyed_by_configured_limit():
+    """Verifiers with the same limit share a semaphore; a different limit gets its own"""
+    first, same, other = DeploymentVerifier(), DeploymentVerifier(), DeploymentVerifier()
+    first.requirements = same.requirements = SystemRequirements(max_concurrent_verify=2)
+    other.requirements = SystemRequirements(max_concurrent_verify=3)
+
+    async def run():
+        peaks = await asyncio.gather(contend(first), contend(same), contend(other, n=6))
+        return peaks, DeploymentVerifier._sems[asyncio.get_running_loop()]
+
+    (first_peak, same_peak, other_peak), sems = asyncio.run(run())
+    assert max(first_peak, same_peak) <= 2
+    assert other_peak == 3
+    assert {limit: sem._value for limit, sem in sems.items()} == {2: 2, 3: 3}
@@ -0,0 +1,82 @@
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.database.database import Base
+from src.database import models
+from src.middleware import auth
+
+engine = create_engine("sqlite://")
+TestingSession = sessionmaker(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._token_cache.clear()
+    yield
+    auth._token_cache.clear()
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSession()
+    session.add(models.User(email="user@example.com", password="hashed"))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_cache_hit_loads_user_in_current_session(db):
+    """A cached token skips verification and returns an instance owned by the caller's session"""
+    payload = {"email": "user@example.com", "exp": time.time() + 600}
+    with patch.object(auth, "verify_token", return_value=payload) as verify:
+        first = auth.get_current_user("token", db)
+        other = TestingSession()
+        try:
+            second = auth.get_current_user("token", other)
+            assert verify.call_count == 1
+            assert second.email == first.email
+            assert second is not first
+            assert second in other
+        finally:
+            other.close()
+
+
+def test_cache_hit_with_dirty_user_in_other_session(db):
+    """A pending change in the session that populated the cache doesn't leak into other requests"""
+    payload = {"email": "user@example.com", "exp": time.time() + 600}
+    with patch.object(auth, "verify_token", return_value=payload):
+        user = auth.get_current_user("token", db)
+        user.password = "changed"
+        other = TestingSession()
+        try:
+            assert auth.get_current_user("token", other).password == "hashed"
+        finally:
+            other.close()
+
+
+def test_invalid_token_is_cached(db):
+    """A rejected token is remembered briefly instead of being verified again"""
+    with patch.object(auth, "verify_token", return_value=None) as verify:
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc:
+                auth.get_current_user("bad-token", db)
+            assert exc.value.status_code == 401
+        assert verify.call_count == 1
+
+
+def test_cache_entry_clamped_to_token_expiry(db):
+    """A token expiring before TOKEN_CACHE_TTL is only cached until its exp"""
+    exp = time.time() + 5
+    with patch.object(auth, "verify_token", return_value={"email": "user@example.com", "exp": exp}):
+        auth.get_current_user("short-token", db)
+    (expires_at, email), = auth._token_cache.values()
+    assert expires_at == exp
+    assert email == "user@example.com"
+
+    assert auth._cache_until({}) <= time.time() + auth.TOKEN_CACHE_TTL
+    assert auth._cache_until({"exp": time.time() + 3600}) <= time.time() + auth.TOKEN_CACHE_TTL
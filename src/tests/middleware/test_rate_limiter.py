@@ -1,14 +1,14 @@
 import pytest
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.testclient import TestClient
-from src.middleware.rate_limiter import RateLimiter
+from unittest.mock import patch
+from src.middleware.rate_limiter import RateLimiter, RateLimiterMiddleware, SWEEP_INTERVAL
 import time
 
 app = FastAPI()
-app.middleware("http")(RateLimiter())
 
-@app.get("/test-rate")
-async def test_rate():
+@app.get("/test-rate", dependencies=[Depends(RateLimiter(max_requests=100))])
+async def rate_limited():
     return {"status": "ok"}
 
 client = TestClient(app)
@@ -22,4 +22,83 @@ def test_rate_limiter():
     # Test exceeding limits
     response = client.get("/test-rate")
     assert response.status_code == 429
-    assert response.json() == {"detail": "Rate limit exceeded"}
+    assert response.json() == {"detail": "Too many requests"}
+    assert "Retry-After" in response.headers
+
+
+def make_limited_app(**limits):
+    limited_app = FastAPI()
+    limited_app.add_middleware(RateLimiterMiddleware, redis_url=None, **limits)
+
+    @limited_app.post("/api/auth/login")
+    async def login():
+        return {"status": "ok"}
+
+    @limited_app.get("/api/users/{user_id}")
+    async def get_user(user_id: int):
+        return {"id": user_id}
+
+    return limited_app
+
+
+def test_middleware_returns_429_with_retry_after():
+    limited_client = TestClient(make_limited_app(login_max_requests=2, login_time_window=60))
+    for _ in range(2):
+        assert limited_client.post("/api/auth/login").status_code == 200
+
+    response = limited_client.post("/api/auth/login")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    assert response.headers["Retry-After"] == "30"
+
+
+def test_middleware_keeps_clients_and_limits_apart():
+    middleware = RateLimiterMiddleware(FastAPI(), max_requests=100, login_max_requests=2, redis_url=None)
+    login, api = middleware._login_limiter, middleware._api_limiter
+
+    # One client's exhausted login budget doesn't throttle another client
+    assert login.take("10.0.0.1") == 0.0
+    assert login.take("10.0.0.1") == 0.0
+    assert login.take("10.0.0.1") > 0
+    assert login.take("10.0.0.2") == 0.0
+
+    # Heavy API traffic, across many resource paths, never touches the login budget
+    for _ in range(100):
+        assert api.take("10.0.0.2") == 0.0
+    assert api.take("10.0.0.2") > 0
+    assert login.take("10.0.0.2") == 0.0
+    assert set(api.buckets) == {"10.0.0.2"}
+
+
+def test_middleware_api_limit_is_per_ip_across_paths():
+    limited_client = TestClient(make_limited_app(max_requests=3, time_window=60))
+    for user_id in range(3):
+        assert limited_client.get(f"/api/users/{user_id}").status_code == 200
+    assert limited_client.get("/api/users/99").status_code == 429
+    assert limited_client.post("/api/auth/login").status_code == 200
+
+
+def test_sweep_evicts_idle_buckets():
+    limiter = RateLimiter(max_requests=5, time_window=60)
+    with patch('src.middleware.rate_limiter.time.monotonic', return_value=1000.0):
+        limiter.take("10.0.0.1")
+    with patch('src.middleware.rate_limiter.time.monotonic', return_value=1050.0):
+        limiter.take("10.0.0.2")
+
+    # At 1070 only 10.0.0.1 has been idle for a full window; the sweep is due as well
+    limiter._next_sweep = 0
+    with patch('src.middleware.rate_limiter.time.monotonic', return_value=1070.0):
+        limiter.take("10.0.0.3")
+
+    assert list(limiter.buckets) == ["10.0.0.2", "10.0.0.3"]
+    assert limiter._next_sweep == 1070.0 + SWEEP_INTERVAL
+
+
+def test_sweep_waits_for_interval():
+    limiter = RateLimiter(max_requests=5, time_window=1)
+    limiter.take("10.0.0.1")
+    limiter.buckets["10.0.0.1"] = (0.0, 0.0)  # Idle for far longer than a window
+    limiter.take("10.0.0.2")
+
+    # Not swept yet: the next sweep is SWEEP_INTERVAL after construction
+    assert "10.0.0.1" in limiter.buckets
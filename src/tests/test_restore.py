@@ -4,7 +4,7 @@ from pathlib import Path
 import os
 import tempfile
 from datetime import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 from ..database.restore_manager import RestoreManager
 from ..monitoring.backup_metrics import BackupMetricsManager
 
@@ -63,24 +63,38 @@ async def test_verify_backup(restore_manager):
 @pytest.mark.asyncio
 async def test_create_database(restore_manager):
     """Test database creation"""
-    with patch('asyncio.create_subprocess_exec') as mock_exec:
-        process_mock = Mock()
-        process_mock.communicate = Mock(return_value=(b"", b""))
-        process_mock.returncode = 0
-        mock_exec.return_value = process_mock
+    conn_mock = AsyncMock()
+    conn_mock.execute.return_value.fetchone.return_value = None
+    pool_mock = MagicMock()
+    pool_mock.connection.return_value.__aenter__.return_value = conn_mock
+
+    with patch.object(restore_manager, '_get_admin_pool', AsyncMock(return_value=pool_mock)):
+        await restore_manager._create_database("test_db")
+
+    # Existence check followed by CREATE DATABASE
+    assert conn_mock.execute.call_count == 2
 
+@pytest.mark.asyncio
+async def test_create_database_existing(restore_manager):
+    """Test database creation is skipped when the database exists"""
+    conn_mock = AsyncMock()
+    conn_mock.execute.return_value.fetchone.return_value = (1,)
+    pool_mock = MagicMock()
+    pool_mock.connection.return_value.__aenter__.return_value = conn_mock
+
+    with patch.object(restore_manager, '_get_admin_pool', AsyncMock(return_value=pool_mock)):
         await restore_manager._create_database("test_db")
-        mock_exec.assert_called_once()
+
+    conn_mock.execute.assert_called_once()
 
 @pytest.mark.asyncio
 async def test_verify_restoration(restore_manager):
     """Test restoration verification"""
-    with patch('asyncio.create_subprocess_exec') as mock_exec:
-        process_mock = Mock()
-        process_mock.communicate = Mock(return_value=(b"42", b""))
-        process_mock.returncode = 0
-        mock_exec.return_value = process_mock
+    conn_mock = AsyncMock()
+    conn_mock.__aenter__.return_value = conn_mock
+    conn_mock.execute.return_value.fetchone.return_value = (42,)
 
+    with patch('psycopg.AsyncConnection.connect', AsyncMock(return_value=conn_mock)):
         assert await restore_manager._verify_restoration("test_db")
 
 @pytest.mark.asyncio
@@ -130,3 +144,21 @@ async def test_restore_backup_with_metrics(restore_manager, mock_storage_client)
 
         await restore_manager.restore_backup("test_backup.sql.gz", "test_db")
         mock_metrics.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_list_backups_limit_with_equal_timestamps(mock_storage_client, restore_manager):
+    """Test that backups created at the same instant can be ranked under a limit"""
+    created = datetime(2024, 1, 1)
+    blobs = []
+    for i in range(5):
+        blob = Mock()
+        blob.name = f"backups/backup_{i}.sql.gz"
+        blob.size = 1024
+        blob.time_created = created
+        blob.metadata = {'checksum': f'checksum_{i}'}
+        blobs.append(blob)
+    restore_manager.bucket.list_blobs.return_value = Mock(pages=iter([blobs[:3], blobs[3:]]))
+
+    backups = await restore_manager.list_available_backups(limit=2)
+    assert len(backups) == 2
+    assert all(backup['created'] == created for backup in backups)
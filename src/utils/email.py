@@ -1,16 +1,67 @@
-import smtplib
+import asyncio
 from email.mime.text import MIMEText
+from typing import Optional
+
+import aiosmtplib
+from cachetools import TTLCache
 from src.config.settings import settings
+from src.utils.validation import contact_digest
 from fastapi import HTTPException, status
 import logging
 
 logger = logging.getLogger(__name__)
 
+# One authenticated SMTP connection is reused across requests; the lock serialises use of it
+# because a single SMTP session can't carry interleaved transactions.
+_smtp_client: Optional[aiosmtplib.SMTP] = None
+_smtp_lock: Optional[asyncio.Lock] = None
+# Digests of contact submissions sent in the last minute; replays are dropped without SMTP
+_recently_sent: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+
+async def _connect() -> aiosmtplib.SMTP:
+    client = aiosmtplib.SMTP(
+        hostname=settings.SMTP_SERVER,
+        port=settings.SMTP_PORT,
+        start_tls=True,
+    )
+    await client.connect()
+    await client.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+    return client
+
+
+async def _send(msg: MIMEText) -> None:
+    global _smtp_client, _smtp_lock
+    if _smtp_lock is None:
+        _smtp_lock = asyncio.Lock()
+    async with _smtp_lock:
+        if _smtp_client is None or not _smtp_client.is_connected:
+            _smtp_client = await _connect()
+        try:
+            await _smtp_client.send_message(msg)
+        except aiosmtplib.SMTPServerDisconnected:
+            # The server dropped the idle connection; reconnect once and retry
+            _smtp_client = await _connect()
+            await _smtp_client.send_message(msg)
+
+
+async def close_smtp_client() -> None:
+    """Closes the shared SMTP connection, if one is open."""
+    global _smtp_client
+    if _smtp_client is not None and _smtp_client.is_connected:
+        try:
+            await _smtp_client.quit()
+        except aiosmtplib.SMTPException as e:
+            logger.warning(f"Error closing SMTP connection: {e}")
+    _smtp_client = None
+
 
 async def send_contact_email(name: str, email: str, message: str):
     """
     Sends a contact email.
 
+    An identical submission already sent within the last minute is dropped.
+
     Args:
         name: Name of the sender.
         email: Email of the sender.
@@ -19,6 +70,12 @@ async def send_contact_email(name: str, email: str, message: str):
     Returns:
         None
     """
+    key = contact_digest(name, email, message)
+    if key in _recently_sent:
+        logger.info("Dropping duplicate contact form submission")
+        return
+    # Claim the submission before sending so concurrent replays are dropped too
+    _recently_sent[key] = True
     try:
         # Create email message
         msg = MIMEText(f"Name: {name}\nEmail: {email}\n\nMessage:\n{message}")
@@ -26,17 +83,16 @@ async def send_contact_email(name: str, email: str, message: str):
         msg["From"] = settings.SMTP_USERNAME
         msg["To"] = "contact@getaisecured.com"
 
-        # Send email
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-    except smtplib.SMTPException as e:
+        # Send email over the shared connection
+        await _send(msg)
+    except aiosmtplib.SMTPException as e:
+        _recently_sent.pop(key, None)
         logger.error(f"SMTP error when sending contact email: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error sending contact email",
         )
     except Exception as e:
+        _recently_sent.pop(key, None)
         logger.error(f"Error sending contact email: {e}")
         raise e
@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 import os
+from collections.abc import Mapping
 from typing import Dict, Any
 
 class LogConfig:
@@ -66,6 +67,12 @@ class LogConfig:
         audit_logger.addHandler(audit_handler)
         audit_logger.propagate = False
 
+def _json_default(obj: Any) -> Any:
+    """Serializes values json can't, such as request header mappings passed lazily in extra"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
 class JsonFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     def format(self, record: logging.LogRecord) -> str:
@@ -87,7 +94,7 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data)
+        return json.dumps(log_data, default=_json_default)
 
 class SecurityAuditLogger:
     """Security audit logging with structured data"""
@@ -1,5 +1,9 @@
 import bleach
+import hashlib
 import re
+from typing import Optional
+
+from cachetools import TTLCache
 from src.utils.constants import (
     PASSWORD_MUST_CONTAIN_DIGIT,
     PASSWORD_MUST_CONTAIN_LETTER,
@@ -28,11 +32,16 @@ ALLOWED_TAGS = [
     "p",
 ]  # Authorized HTML tags
 
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+
+# Outcome of recent validate_contact calls keyed by a digest of the inputs: None when the
+# inputs were valid, otherwise the error detail. Absorbs floods of identical submissions.
+_contact_results: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
 
 def is_email(value: str) -> bool:
     """Check if the value is a valid email."""
-    email_regex = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    return bool(re.fullmatch(email_regex, value))
+    return bool(_EMAIL_RE.fullmatch(value))
 
 
 def sanitize_text(text: str) -> str:
@@ -55,10 +64,27 @@ def password_validator(cls, value):
     return sanitized_value
 
 
+def contact_digest(*fields: str) -> bytes:
+    """Returns a short digest identifying a contact form submission."""
+    return hashlib.blake2b("\0".join(fields).encode(), digest_size=16).digest()
+
+
+def _contact_error(name: str, message: str) -> Optional[str]:
+    sanitized_name = sanitize_text(name)
+    sanitized_message = sanitize_text(message)
+    if len(sanitized_name) < 3:
+        return INVALID_CONTACT_NAME
+    if len(sanitized_message) < 10:
+        return INVALID_CONTACT_MESSAGE
+    return None
+
+
 def validate_contact(name: str, message: str):
     """
     Validates the contact form inputs.
 
+    Outcomes are remembered for a minute, so repeated identical submissions skip sanitization.
+
     Args:
         name: name of the contact.
         message: message of the contact.
@@ -68,10 +94,10 @@ def validate_contact(name: str, message: str):
     """
     if not isinstance(name, str) or not isinstance(message, str):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_INPUT)
-    sanitized_name = sanitize_text(name)
-    sanitized_message = sanitize_text(message)
-    if len(sanitized_name) < 3 or len(sanitized_name) < 1:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CONTACT_NAME)
-    if len(sanitized_message) < 10 or len(sanitized_message) < 1:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CONTACT_MESSAGE)
+    key = contact_digest(name, message)
+    try:
+        error = _contact_results[key]
+    except KeyError:
+        error = _contact_results[key] = _contact_error(name, message)
+    if error is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)